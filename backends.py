@@ -0,0 +1,658 @@
+# backends 負責封裝各個翻譯後端 (Gemini / 本機 Argos / Google)，並以對沖 (hedge) 或競速 (race) 策略呼叫它們。
+import importlib.util
+import json
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import requests
+from google.genai import types
+
+import config
+from cache import get_translation_cache
+from language import chinese_converter, text_language
+from tracing import get_tracer, optional_span
+
+
+class TranslationError(Exception):
+    """所有翻譯後端都失敗時拋出"""
+
+
+class JobCancelled(Exception):
+    """工作已被較新的請求取代 (或程式正在結束)，在階段之間或等待翻譯時拋出"""
+
+
+class BatchSplitError(Exception):
+    """批次翻譯的回應無法安全拆回各段 (段數不符、格式錯誤)"""
+
+
+class LatencyStats:
+    """保留最近 N 次呼叫的延遲，用來計算 p50 / p95"""
+
+    def __init__(self, window=200):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.successes = 0
+        self.failures = 0
+
+    def record(self, seconds, ok=True):
+        with self._lock:
+            if ok:
+                self._samples.append(seconds)
+                self.successes += 1
+            else:
+                self.failures += 1
+
+    def percentile(self, p):
+        with self._lock:
+            if not self._samples:
+                return None
+            ordered = sorted(self._samples)
+        idx = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+        return ordered[idx]
+
+    def summary(self):
+        return {
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "successes": self.successes,
+            "failures": self.failures,
+        }
+
+
+class CallRecord:
+    """單次後端呼叫的統計只記一次：已經以逾時記為失敗的呼叫，之後才完成時不再記成功"""
+
+    def __init__(self):
+        self._recorded = False
+        self._lock = threading.Lock()
+
+    def claim(self):
+        with self._lock:
+            if self._recorded:
+                return False
+            self._recorded = True
+            return True
+
+
+class BackendHealth:
+    """單一後端的健康狀態：EWMA 延遲 / 錯誤率，以及斷路器
+
+    - closed：正常呼叫
+    - open：連續失敗達門檻，冷卻期間直接略過
+    - half_open：冷卻結束後只放行一個試探呼叫，成功就恢復 closed，失敗再回到 open
+    """
+
+    def __init__(self, alpha=0.3, failure_threshold=3, cooldown=30.0):
+        self.alpha = alpha
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.ewma_latency = None   # 秒 (只計成功的呼叫)
+        self.ewma_error = 0.0      # 0~1，沒有新呼叫時每經過一個 cooldown 減半
+        self._error_updated = time.monotonic()
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def _current_error(self):
+        # 只靠呼叫更新的話，被排到後面的後端永遠沒機會洗掉舊的失敗紀錄
+        elapsed = time.monotonic() - self._error_updated
+        return self.ewma_error * 0.5 ** (elapsed / self.cooldown) if self.cooldown else self.ewma_error
+
+    def _refresh(self):
+        if self.state == "open" and time.monotonic() - self.opened_at >= self.cooldown:
+            self.state = "half_open"
+            self._probing = False
+
+    def available(self):
+        """目前能否呼叫 (不改變狀態，用來排路由)"""
+        with self._lock:
+            self._refresh()
+            return self.state == "closed" or (self.state == "half_open" and not self._probing)
+
+    def acquire(self):
+        """真正要呼叫前取得許可；half_open 時只有第一個呼叫者拿得到試探名額"""
+        with self._lock:
+            self._refresh()
+            if self.state == "closed":
+                return True
+            if self.state == "half_open" and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def release(self):
+        with self._lock:
+            self._probing = False
+
+    def record(self, seconds, ok):
+        with self._lock:
+            self.ewma_error = self.alpha * (0.0 if ok else 1.0) + (1 - self.alpha) * self._current_error()
+            self._error_updated = time.monotonic()
+            if ok:
+                self.ewma_latency = seconds if self.ewma_latency is None else (
+                    self.alpha * seconds + (1 - self.alpha) * self.ewma_latency)
+                self.consecutive_failures = 0
+                self.state = "closed"
+                self._probing = False
+                return
+            self.consecutive_failures += 1
+            if self.state == "half_open" or self.consecutive_failures >= self.failure_threshold:
+                self.state = "open"
+                self.opened_at = time.monotonic()
+                self._probing = False
+
+    def expected_cost(self, timeout, prior_latency):
+        """預期花費的秒數：成功時的延遲 + 失敗機率 x 逾時 (尚無資料時用 prior_latency)"""
+        with self._lock:
+            latency = self.ewma_latency if self.ewma_latency is not None else prior_latency
+            error = self._current_error()
+            return latency * (1 - error) + timeout * error
+
+    def snapshot(self):
+        with self._lock:
+            self._refresh()
+            remaining = None
+            if self.state == "open":
+                remaining = max(0.0, self.cooldown - (time.monotonic() - self.opened_at))
+            return {
+                "state": self.state,
+                "ewma_latency": self.ewma_latency,
+                "ewma_error": self._current_error(),
+                "consecutive_failures": self.consecutive_failures,
+                "cooldown_remaining": remaining,
+            }
+
+
+def backend_timeout(name):
+    """後端的逾時秒數 (BACKEND_TIMEOUTS)，BackendChain 等待與 HTTP 連線共用同一個值"""
+    return config.BACKEND_TIMEOUTS.get(name, 10.0)
+
+
+def create_gemini_client(api_key):
+    """建立 Gemini Client；HTTP 請求本身也設定逾時，卡住的請求不會一直佔著執行緒 (結束程式時也不必等它)"""
+    from google import genai
+    return genai.Client(api_key=api_key,
+                        http_options=types.HttpOptions(timeout=int(backend_timeout("gemini") * 1000)))
+
+
+class GeminiBackend:
+    name = "gemini"
+    label = "Gemini"
+
+    def __init__(self, client):
+        self.client = client
+
+    def translate(self, text, on_partial=None):
+        prompt = (
+            f"Translate the following text into {config.TARGET_LANG}. "
+            f"Output ONLY the translated text without explanations.\n\n"
+            f"{text}"
+        )
+        if not config.STREAM_TRANSLATION:
+            response = self.client.models.generate_content(
+                model=config.MODEL_NAME,
+                contents=prompt
+            )
+            return response.text.strip() if response.text else ""
+
+        # 串流：邊收邊把部分譯文推給介面 (依 STREAM_UPDATE_INTERVAL_MS 節流)
+        pieces = []
+        last_emit = 0.0
+        interval = config.STREAM_UPDATE_INTERVAL_MS / 1000
+        for chunk in self.client.models.generate_content_stream(
+            model=config.MODEL_NAME,
+            contents=prompt
+        ):
+            if not chunk.text:
+                continue
+            pieces.append(chunk.text)
+            now = time.monotonic()
+            if on_partial and now - last_emit >= interval:
+                last_emit = now
+                on_partial(self, "".join(pieces).strip())
+        return "".join(pieces).strip()
+
+    def translate_batch(self, texts):
+        """把多段文字包成 JSON 陣列送出一次請求，並要求模型回傳同長度的 JSON 字串陣列"""
+        prompt = (
+            f"Translate each string in the following JSON array into {config.TARGET_LANG}. "
+            f"Return a JSON array of exactly {len(texts)} strings, where the i-th element is the "
+            f"translation of the i-th input. Do not merge, split or skip elements.\n\n"
+            f"{json.dumps(texts, ensure_ascii=False)}"
+        )
+        response = self.client.models.generate_content(
+            model=config.MODEL_NAME,
+            contents=prompt,
+            config=types.GenerateContentConfig(
+                response_mime_type="application/json",
+                response_schema=list[str],
+            ),
+        )
+        try:
+            results = json.loads(response.text or "")
+        except ValueError as e:
+            raise BatchSplitError(f"JSON 解析失敗: {e}")
+        if not isinstance(results, list) or len(results) != len(texts):
+            raise BatchSplitError(f"段數不符 (送出 {len(texts)} 段)")
+        if not all(isinstance(r, str) for r in results):
+            raise BatchSplitError("回應中含有非字串元素")
+        return [r.strip() for r in results]
+
+
+class GoogleBackend:
+    """Google 翻譯的免金鑰端點，直接用 requests 呼叫
+
+    deep_translator 的 GoogleTranslator 不接受逾時設定，卡住的請求會一直佔著執行緒；
+    這裡每個請求都帶 timeout，並共用同一個 Session 重複使用連線。
+    """
+    name = "google"
+    label = "Google"
+    URL = "https://translate.googleapis.com/translate_a/single"
+
+    def __init__(self, target="zh-TW", timeout=6.0):
+        self.target = target
+        self.timeout = timeout
+        self._session = requests.Session()
+
+    def translate(self, text, on_partial=None):
+        response = self._session.get(
+            self.URL,
+            params={"client": "gtx", "sl": "auto", "tl": self.target, "dt": "t", "q": text},
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        # 回應為 [[[譯文片段, 原文片段, ...], ...], ...]
+        sentences = response.json()[0] or []
+        return "".join(part[0] for part in sentences if part and part[0]).strip()
+
+    def translate_batch(self, texts):
+        # 沒有真正的批次 API，逐段呼叫但共用同一個 Session
+        return [self.translate(text) for text in texts]
+
+
+class BackendChain:
+    """依序排列的翻譯後端，支援三種策略：
+    - sequential：前一個失敗或逾時才換下一個 (原本的行為)
+    - hedge：前一個超過 HEDGE_DELAY_MS 還沒回來就同時啟動下一個，取最先成功的
+    - race：全部同時啟動，取最先成功的
+    沒被採用的呼叫無法中斷，只會被忽略。
+
+    adaptive=True 時每次呼叫前依「預期花費 + 設定順位 x priority_penalty 秒」重新排序，
+    斷路器 open 的後端直接略過；每次的路由決策保留在 decisions，可由 health_report() 查詢。
+    """
+
+    def __init__(self, backends, policy="hedge", hedge_delay=0.8, timeouts=None, cache=None,
+                 adaptive=False, priority_penalty=2.0, prior_latency=1.0, health_options=None, tracer=None):
+        self.backends = backends
+        # 未指定時使用全域共用的翻譯快取 (benchmark 等工具可傳入獨立的快取)
+        self.cache = cache if cache is not None else get_translation_cache()
+        # translate / route span 寫到哪個 tracer；None 時不記錄 (benchmark 不能把假後端的 span 寫進正式的 trace 檔)
+        self.tracer = tracer
+        self.policy = policy
+        self.hedge_delay = hedge_delay
+        self.timeouts = timeouts or {}
+        self.stats = {b.name: LatencyStats() for b in backends}
+        self.health = {b.name: BackendHealth(**(health_options or {})) for b in backends}
+        self.adaptive = adaptive
+        self.priority_penalty = priority_penalty
+        self.prior_latency = prior_latency
+        self.decisions = deque(maxlen=50)  # 最近幾次的路由決策
+        # 多個區域會同時翻譯，且被忽略的慢速呼叫仍會佔住執行緒，所以多留一些空間
+        self._executor = ThreadPoolExecutor(max_workers=max(4, len(backends) * config.OCR_WORKERS),
+                                            thread_name_prefix="translate")
+
+    def _record(self, backend, seconds, ok, record=None):
+        if record is not None and not record.claim():
+            return
+        self.stats[backend.name].record(seconds, ok=ok)
+        self.health[backend.name].record(seconds, ok)
+
+    def _route(self, texts=()):
+        """回傳 (本次的呼叫順序, 略過的後端 {名稱: 原因}, 各後端分數, 是否因全部故障而強制全試)
+
+        有 accepts(text) 的後端 (只會單一來源語言的本機 Argos) 遇到不支援的文字一律排除，強制全試時也一樣。
+        """
+        scores = {}
+        for idx, backend in enumerate(self.backends):
+            cost = self.health[backend.name].expected_cost(self.timeouts.get(backend.name, 10.0), self.prior_latency)
+            scores[backend.name] = cost + self.priority_penalty * idx
+        ordered = list(self.backends)
+        if self.adaptive:
+            ordered.sort(key=lambda b: scores[b.name])
+
+        unsupported = {b.name: "不支援此來源語言" for b in ordered
+                       if hasattr(b, "accepts") and not all(b.accepts(text) for text in texts)}
+        ordered = [b for b in ordered if b.name not in unsupported]
+        skipped = {b.name: "斷路器開啟" for b in ordered if not self.health[b.name].available()}
+        routed = [b for b in ordered if b.name not in skipped]
+        if not routed and ordered:
+            # 全部都在冷卻中也不能不翻譯，照原順序全部再試一次
+            print("[WARN] 所有翻譯後端的斷路器都已開啟，仍依序嘗試")
+            return ordered, unsupported, scores, True
+        if skipped:
+            print(f"[INFO] 略過暫時故障的後端: {', '.join(skipped)}")
+        return routed, {**unsupported, **skipped}, scores, False
+
+    def _launch_delay(self):
+        if self.policy == "race":
+            return 0.0
+        if self.policy == "hedge":
+            return self.hedge_delay
+        return float("inf")
+
+    def _call(self, backend, text, on_partial, job_id=None, record=None):
+        with optional_span(self.tracer, job_id, "translate", backend=backend.name) as span:
+            # 每個後端前面先查快取，命中時幾乎瞬間完成
+            cache = self.cache
+            if cache:
+                cached = cache.get(text, backend.name)
+                span["cache_hit"] = cached is not None
+                if cached is not None:
+                    print(f"[INFO] 快取命中 ({backend.label})，{cache_summary(cache)}")
+                    # 沒有真的呼叫後端，half_open 的試探名額要還回去 (否則之後永遠不會再試探)
+                    self.health[backend.name].release()
+                    return cached
+
+            print(f"[INFO] 嘗試使用 {backend.label} 翻譯...")
+            started = time.perf_counter()
+            try:
+                result = backend.translate(text, on_partial)
+            except Exception:
+                self._record(backend, time.perf_counter() - started, ok=False, record=record)
+                raise
+            self._record(backend, time.perf_counter() - started, ok=bool(result), record=record)
+            if cache and result:
+                cache.put(text, backend.name, result)
+            return result
+
+    def _call_batch(self, backend, texts, job_id=None, record=None):
+        """一次翻譯多段文字；快取命中的段落不送出，回應無法安全拆分時退回逐段呼叫"""
+        with optional_span(self.tracer, job_id, "translate_batch", backend=backend.name, segments=len(texts)) as span:
+            results = [None] * len(texts)
+            cache = self.cache
+            if cache:
+                for i, text in enumerate(texts):
+                    results[i] = cache.get(text, backend.name)
+            missing = [i for i, r in enumerate(results) if r is None]
+            span["cache_hits"] = len(texts) - len(missing)
+            if not missing:
+                self.health[backend.name].release()
+                return results
+
+            print(f"[INFO] 嘗試使用 {backend.label} 批次翻譯 {len(missing)} 段...")
+            started = time.perf_counter()
+            try:
+                batch = [texts[i] for i in missing]
+                translated = None
+                translate_batch = getattr(backend, "translate_batch", None)
+                if translate_batch is not None and len(batch) > 1:
+                    try:
+                        translated = translate_batch(batch)
+                    except BatchSplitError as e:
+                        print(f"[WARN] {backend.label} 批次結果無法拆分 ({e})，改為逐段翻譯")
+                        span["fallback"] = True
+                if translated is None:
+                    translated = [backend.translate(text) for text in batch]
+            except Exception:
+                self._record(backend, time.perf_counter() - started, ok=False, record=record)
+                raise
+            ok = all(translated)
+            self._record(backend, time.perf_counter() - started, ok=ok, record=record)
+
+            for i, result in zip(missing, translated):
+                results[i] = result
+                if cache and result:
+                    cache.put(texts[i], backend.name, result)
+            return results
+
+    def translate(self, text, on_partial=None, job_id=None, cancelled=None):
+        """回傳 (backend, 譯文)；全部失敗時拋出 TranslationError
+
+        cancelled() 回傳 True 時不再等待 (拋出 JobCancelled)，進行中的呼叫只會被忽略。
+        """
+        # 只有尚未決定結果前的部分譯文才往外送，避免慢的後端蓋掉已顯示的最終結果
+        settle_lock = threading.Lock()
+        settled = [False]
+
+        def guarded_partial(backend, partial):
+            if on_partial is None:
+                return
+            with settle_lock:
+                if not settled[0]:
+                    on_partial(backend, partial)
+
+        try:
+            return self._run_policy(lambda backend, record: self._call(backend, text, guarded_partial, job_id, record),
+                                    accept=bool, texts=[text], cancelled=cancelled, job_id=job_id)
+        finally:
+            with settle_lock:
+                settled[0] = True
+
+    def translate_batch(self, texts, job_id=None, cancelled=None):
+        """批次版本：回傳 (backend, [譯文, ...])，順序與 texts 相同"""
+        if len(texts) == 1:
+            backend, result = self.translate(texts[0], job_id=job_id, cancelled=cancelled)
+            return backend, [result]
+        return self._run_policy(lambda backend, record: self._call_batch(backend, texts, job_id, record),
+                                accept=lambda results: all(results), texts=texts, cancelled=cancelled, job_id=job_id)
+
+    # 有 cancelled 時，等待結果的同時每隔多久檢查一次是否已被取消
+    CANCEL_POLL = 0.05
+
+    def _run_policy(self, call, accept, texts, cancelled=None, job_id=None):
+        """依策略啟動各後端的 call(backend, record)，回傳第一個被 accept 接受的 (backend, 結果)
+
+        record (CallRecord) 讓逾時與稍後才完成的同一個呼叫只計入一次統計。
+        """
+        if not self.backends:
+            raise TranslationError("沒有可用的翻譯後端")
+
+        backends, skipped, scores, forced = self._route(texts)
+        if not backends:
+            raise TranslationError("沒有支援此文字的翻譯後端")
+        decision = {
+            "job_id": job_id,
+            "time": time.time(),
+            "policy": self.policy,
+            "order": [b.name for b in backends],
+            "skipped": skipped,
+            "scores": {name: round(score, 3) for name, score in scores.items()},
+            "forced": forced,
+            "launched": [],
+            "winner": None,
+        }
+        self.decisions.append(decision)
+        with optional_span(self.tracer, job_id, "route", order=decision["order"], skipped=list(skipped)) as span:
+            try:
+                backend, result = self._run_backends(backends, call, accept, cancelled, decision)
+            except JobCancelled:
+                decision["winner"] = "cancelled"
+                raise
+            decision["winner"] = span["winner"] = backend.name
+        return backend, result
+
+    def _run_backends(self, backends, call, accept, cancelled, decision):
+        delay = self._launch_delay()
+        pending = {}  # future -> (backend, deadline, CallRecord)
+        errors = []
+        next_idx = 0
+        next_launch = time.monotonic()
+
+        try:
+            while pending or next_idx < len(backends):
+                if cancelled is not None and cancelled():
+                    raise JobCancelled()
+                now = time.monotonic()
+                # 沒有進行中的呼叫 (例如前一個已失敗) 就立刻啟動下一個
+                if next_idx < len(backends) and (not pending or now >= next_launch):
+                    backend = backends[next_idx]
+                    next_idx += 1
+                    # half_open 的後端同一時間只放行一個試探呼叫
+                    if not self.health[backend.name].acquire() and not decision["forced"]:
+                        decision["skipped"][backend.name] = "試探進行中"
+                        errors.append(f"{backend.label}: 斷路器試探進行中")
+                        continue
+                    decision["launched"].append(backend.name)
+                    deadline = now + self.timeouts.get(backend.name, 10.0)
+                    record = CallRecord()
+                    future = self._executor.submit(call, backend, record)
+                    pending[future] = (backend, deadline, record)
+                    next_launch = now + delay
+                    continue
+
+                wake_at = min(deadline for _, deadline, _ in pending.values())
+                if next_idx < len(backends):
+                    wake_at = min(wake_at, next_launch)
+                if cancelled is not None:
+                    wake_at = min(wake_at, now + self.CANCEL_POLL)
+                done, _ = wait(list(pending), timeout=max(0.0, wake_at - now), return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    backend, _, _ = pending.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        print(f"[WARN] {backend.label} 翻譯失敗 ({e})")
+                        errors.append(f"{backend.label}: {e}")
+                        continue
+                    if accept(result):
+                        return backend, result
+                    errors.append(f"{backend.label}: 未回傳內容")
+
+                now = time.monotonic()
+                for future, (backend, deadline, record) in list(pending.items()):
+                    if now >= deadline:
+                        pending.pop(future)
+                        print(f"[WARN] {backend.label} 翻譯逾時，忽略其結果")
+                        # 之後才完成的呼叫不會再記一次成功 (否則一直剛好超過逾時的後端斷路器永遠不會開啟)
+                        self._record(backend, self.timeouts.get(backend.name, 10.0), ok=False, record=record)
+                        errors.append(f"{backend.label}: 逾時")
+        finally:
+            for future, (backend, _, _) in pending.items():
+                # 還沒開始執行就被取消的試探呼叫要把名額還回去
+                if future.cancel():
+                    self.health[backend.name].release()
+
+        raise TranslationError("; ".join(errors))
+
+    def latency_report(self):
+        """各後端的 p50 / p95 延遲 (秒) 與成功失敗次數"""
+        return {name: stats.summary() for name, stats in self.stats.items()}
+
+    def health_report(self):
+        """各後端的健康狀態、延遲統計與最近的路由決策 (由新到舊)"""
+        return {
+            "adaptive": self.adaptive,
+            "backends": {
+                b.name: {**self.health[b.name].snapshot(), **self.stats[b.name].summary()}
+                for b in self.backends
+            },
+            "decisions": list(reversed(self.decisions)),
+        }
+
+
+class LocalBackend:
+    """本機 CPU 翻譯 (Argos Translate，底層為 CTranslate2 量化模型)，完全不需要網路
+
+    模型在背景執行緒載入一次並先翻一句暖機，之後常駐在記憶體。
+    Argos 只會單一來源語言，accepts() 判斷不符的文字不會被路由過來；
+    輸出的簡體中文以 convert (例如 OpenCC s2t) 轉成目標寫法。
+    """
+    name = "local"
+    label = "Argos"
+
+    # Argos 來源語言代碼 -> text_language() 的判斷結果 (其餘代碼視為拉丁字母語言)
+    SOURCE_LANGUAGES = {"zh": {"hans", "hant", "han"}, "ja": {"ja"}, "ko": {"ko"}}
+
+    def __init__(self, from_code="en", to_code="zh", convert=None):
+        self.from_code = from_code
+        self.to_code = to_code
+        self.convert = convert
+        self._languages = self.SOURCE_LANGUAGES.get(from_code, {"latin"})
+        self._translation = None
+        self._load_error = None
+        self._ready = threading.Event()
+        self._lock = threading.Lock()  # 同一個模型一次只跑一個請求
+        threading.Thread(target=self._load, name="local-model-load", daemon=True).start()
+
+    def _load(self):
+        try:
+            from argostranslate import translate as argos_translate
+            translation = argos_translate.get_translation_from_codes(self.from_code, self.to_code)
+            if translation is None:
+                raise TranslationError(f"未安裝 {self.from_code} -> {self.to_code} 的 Argos 語言包")
+            translation.translate("Hello")  # 第一次呼叫才會真正載入模型
+            self._translation = translation
+            print(f"[INFO] 本機翻譯模型已載入 ({self.from_code} -> {self.to_code})")
+        except Exception as e:
+            self._load_error = e
+            print(f"[WARN] 本機翻譯模型載入失敗: {e}")
+        finally:
+            self._ready.set()
+
+    def accepts(self, text):
+        return text_language(text) in self._languages
+
+    def translate(self, text, on_partial=None):
+        self._ready.wait()
+        if self._translation is None:
+            raise TranslationError(f"本機翻譯模型無法使用: {self._load_error}")
+        with self._lock:
+            result = self._translation.translate(text) or ""
+        return self.convert(result) if self.convert and result else result
+
+    def translate_batch(self, texts):
+        return [self.translate(text) for text in texts]
+
+
+def cache_summary(cache):
+    stats = cache.stats()
+    return (f"命中 {stats['memory_hits'] + stats['disk_hits']} / 未命中 {stats['misses']} "
+            f"(命中率 {stats['hit_rate']:.0%})")
+
+
+def build_backend_chain(gemini_client=None):
+    """依 BACKEND_ORDER 組出後端串列；缺少 API Key 或套件的後端會被略過"""
+    backends = []
+    for name in config.BACKEND_ORDER:
+        if name == "gemini":
+            if gemini_client:
+                backends.append(GeminiBackend(gemini_client))
+            else:
+                print("[INFO] 未設定 Gemini API Key，直接使用備用方案。")
+        elif name == "local":
+            if importlib.util.find_spec("argostranslate") is None:
+                print("[INFO] 未安裝 argostranslate，略過本機翻譯後端。")
+                continue
+            convert = None
+            if config.LOCAL_TARGET_LANG == "zh" and config.TARGET_SCRIPT == "hant":
+                # Argos 的中文模型只輸出簡體，目標是繁體時必須能轉換
+                converter = chinese_converter("s2t")
+                if converter is None:
+                    print("[INFO] 未安裝 opencc，本機翻譯無法輸出繁體中文，略過本機翻譯後端。")
+                    continue
+                convert = converter.convert
+            backends.append(LocalBackend(config.LOCAL_SOURCE_LANG, config.LOCAL_TARGET_LANG, convert))
+        elif name == "google":
+            backends.append(GoogleBackend(timeout=backend_timeout("google")))
+        else:
+            print(f"[WARN] 未知的翻譯後端: {name}")
+    return BackendChain(
+        backends,
+        policy=config.TRANSLATION_POLICY,
+        hedge_delay=config.HEDGE_DELAY_MS / 1000,
+        timeouts=config.BACKEND_TIMEOUTS,
+        adaptive=config.ADAPTIVE_ROUTING,
+        priority_penalty=config.ROUTING_PRIORITY_PENALTY_SEC,
+        prior_latency=config.ROUTING_PRIOR_LATENCY,
+        health_options={
+            "alpha": config.HEALTH_EWMA_ALPHA,
+            "failure_threshold": config.CIRCUIT_FAILURE_THRESHOLD,
+            "cooldown": config.CIRCUIT_COOLDOWN_SEC,
+        },
+        tracer=get_tracer(),
+    )
@@ -0,0 +1,110 @@
+# batch_translate 不開 GUI，批次辨識並翻譯整個資料夾的截圖 (例如試玩時大量擷取的畫面)，結果以 JSONL 逐筆輸出。
+# 用法:
+#   python batch_translate.py screenshots/                          # 整個資料夾，輸出到螢幕
+#   python batch_translate.py "shots/**/*.png" --output result.jsonl
+#   python batch_translate.py shots/ --no-translate --workers 8     # 只跑 OCR
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from multiprocessing import Pool
+
+import config
+from pipeline import BatchTranslator, create_translation_chain, read_image, recognize_frame
+
+IMAGE_EXTS = (".png", ".jpg", ".jpeg", ".bmp", ".webp")
+
+# 每個子行程各自常駐一個 OCR 引擎
+_engine = None
+
+
+def _init_process(engine_name):
+    global _engine
+    import cv2
+    from ocr_engines import create_ocr_engine
+
+    sys.stdout = sys.stderr  # 記錄訊息一律走 stderr，stdout 只留給 JSONL
+    cv2.setNumThreads(1)  # 平行度交給行程池，避免每個行程再各開一堆 OpenCV 執行緒
+    _engine = create_ocr_engine(engine_name)
+
+
+def _ocr_path(path):
+    """子行程中執行：讀圖 -> 文字偵測 -> 前處理 -> OCR"""
+    started = time.perf_counter()
+    try:
+        gray = read_image(path)
+        if gray is None:
+            raise ValueError("無法讀取圖片")
+        text = recognize_frame(_engine, gray)
+        error = None
+    except Exception as e:
+        text, error = "", str(e)
+    return {"path": path, "text": text, "ocr_ms": round((time.perf_counter() - started) * 1000, 1), "error": error}
+
+
+def collect_paths(inputs, recursive=False):
+    """資料夾或 glob 樣式 -> 排序過、不重複的圖片路徑"""
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            pattern = os.path.join(item, "**", "*") if recursive else os.path.join(item, "*")
+            candidates = glob.glob(pattern, recursive=recursive)
+        else:
+            candidates = glob.glob(item, recursive=True)
+        paths.extend(p for p in candidates if p.lower().endswith(IMAGE_EXTS) and os.path.isfile(p))
+    return sorted(dict.fromkeys(paths))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="批次 OCR + 翻譯截圖，輸出 JSONL")
+    parser.add_argument("inputs", nargs="+", help="圖片資料夾或 glob 樣式 (例如 \"shots/**/*.png\")")
+    parser.add_argument("--output", help="JSONL 輸出檔 (預設輸出到螢幕)")
+    parser.add_argument("--recursive", action="store_true", help="資料夾包含子資料夾")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4, help="OCR 行程數 (預設 = CPU 核心數)")
+    parser.add_argument("--ocr-engine", default=None, help="覆寫 config.OCR_ENGINE")
+    parser.add_argument("--no-translate", action="store_true", help="只做 OCR，不翻譯")
+    args = parser.parse_args()
+
+    paths = collect_paths(args.inputs, args.recursive)
+    if not paths:
+        sys.exit("找不到任何圖片")
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    sys.stdout = sys.stderr  # 記錄訊息一律走 stderr，stdout 只留給 JSONL
+    written = [0]
+
+    def write(record):
+        out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        out.flush()
+        written[0] += 1
+
+    translator = None
+    if not args.no_translate:
+        translator = BatchTranslator(create_translation_chain(), write, config.BATCH_MAX_SEGMENTS, config.BATCH_MAX_CHARS)
+
+    started = time.perf_counter()
+    print(f"[INFO] 共 {len(paths)} 張圖片，{args.workers} 個 OCR 行程", file=sys.stderr)
+    try:
+        with Pool(args.workers, initializer=_init_process, initargs=(args.ocr_engine,)) as pool:
+            for record in pool.imap_unordered(_ocr_path, paths, chunksize=4):
+                if translator is None or not record["text"]:
+                    write(record)
+                else:
+                    translator.add(record)
+        if translator is not None:
+            translator.finish()
+    finally:
+        if args.output:
+            out.close()
+
+    elapsed = time.perf_counter() - started
+    summary = f"[INFO] 完成 {written[0]} 張，耗時 {elapsed:.1f}s ({written[0] / elapsed:.1f} 張/秒)"
+    if translator is not None:
+        summary += f"，實際翻譯 {translator.segments_sent} 段不重複的文字"
+    print(summary, file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
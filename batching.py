@@ -0,0 +1,82 @@
+# batching 負責把短時間內陸續送來的翻譯請求 (例如多個區域同時完成 OCR) 合併成一次批次請求。
+import queue
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+
+from backends import JobCancelled
+
+# 一段等待翻譯的文字；future 完成時得到 (backend, 譯文)
+_Segment = namedtuple("_Segment", ["text", "job_id", "future"])
+
+
+class TranslationBatcher:
+    """收集視窗內的翻譯請求，湊滿段數 / 字數上限或時間到就整批送給 BackendChain.translate_batch
+
+    呼叫端照常以阻塞方式呼叫 translate()，不需要知道背後是否被合併。
+    """
+
+    def __init__(self, chain, window=0.03, max_segments=8, max_chars=4000):
+        self.chain = chain
+        self.window = window
+        self.max_segments = max_segments
+        self.max_chars = max_chars
+        self._queue = queue.Queue()
+        # 收集下一批的同時，前一批可能還在等網路回應
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="batch")
+        self._thread = threading.Thread(target=self._collect_loop, name="batch-collector", daemon=True)
+        self._thread.start()
+
+    def translate(self, text, job_id=None, cancelled=None):
+        """回傳 (backend, 譯文)；失敗時拋出與 BackendChain.translate 相同的例外
+
+        cancelled() 回傳 True 時不再等待 (拋出 JobCancelled)，同一批的其他段落不受影響。
+        """
+        future = Future()
+        self._queue.put(_Segment(text, job_id, future))
+        while True:
+            try:
+                return future.result(timeout=0.05)
+            except FutureTimeout:
+                if cancelled is not None and cancelled():
+                    raise JobCancelled()
+
+    def _collect_loop(self):
+        while True:
+            first = self._queue.get()
+            batch = [first]
+            chars = len(first.text)
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_segments:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    segment = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                # 超過字數上限的那一段留給下一批
+                if chars + len(segment.text) > self.max_chars:
+                    self._executor.submit(self._dispatch, batch)
+                    batch, chars = [], 0
+                    deadline = time.monotonic() + self.window
+                batch.append(segment)
+                chars += len(segment.text)
+            self._executor.submit(self._dispatch, batch)
+
+    def _dispatch(self, batch):
+        # 同一批裡重複的文字只送一次
+        unique = list(dict.fromkeys(segment.text for segment in batch))
+        try:
+            backend, results = self.chain.translate_batch(unique, job_id=batch[0].job_id)
+        except Exception as e:
+            for segment in batch:
+                segment.future.set_exception(e)
+            return
+        if len(unique) > 1:
+            print(f"[INFO] 批次翻譯 {len(unique)} 段 ({backend.label})")
+        translated = dict(zip(unique, results))
+        for segment in batch:
+            segment.future.set_result((backend, translated[segment.text]))
@@ -0,0 +1,266 @@
+# benchmark 離線量測 前處理 -> OCR -> 翻譯 各階段的延遲與吞吐量，不需要螢幕也不需要 Gemini。
+# 用法:
+#   python benchmark.py --make-fixtures                 # 產生合成的遊戲文字圖片到 bench_fixtures/
+#   python benchmark.py --rounds 3 --output bench.json  # 跑基準測試並輸出 JSON
+#   python benchmark.py --compare old.json              # 與之前的結果比較
+import argparse
+import glob
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+
+import cv2
+import numpy as np
+
+import config
+from backends import BackendChain
+from cache import TranslationCache
+from frame_hash import FrameOCRCache
+from language import RegionLanguages
+from ocr_engines import create_ocr_engine
+from pipeline import recognize_frame
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_fixtures")
+
+# 合成圖片用的台詞 (長短不一，模擬對話框、道具名稱、系統訊息)
+FIXTURE_LINES = [
+    "Welcome back, traveler.",
+    "The gate will not open without the silver key.",
+    "Quest updated: Find the lost merchant",
+    "HP 120/150   MP 45/60",
+    "You obtained [Ancient Sword]!",
+    "Are you sure you want to leave? Unsaved progress will be lost.",
+    "Press any button to continue",
+    "The dragon awakens... Prepare yourself!",
+]
+
+
+class _SkippedOCREngine:
+    """--skip-ocr 時代替真正的引擎，讓偵測與前處理照常量測 (辨識結果一律為空字串)"""
+    name = None
+    needs_binary = True
+    selectable_lang = False
+    last_confidence = None
+
+    def recognize(self, image, single_line=False, lang=None):
+        return ""
+
+
+class StageRecorder:
+    """與 Tracer 相同的 span() 介面：recognize_frame 的各階段耗時累加到目前這張圖，frame_done() 時寫入 stages"""
+
+    def __init__(self, stages):
+        self.stages = stages
+        self.attrs = {}     # 目前這張圖各 span 補充的欄位 (lines、pixels...)
+        self._current = {}  # 階段名稱 -> 目前這張圖累計的秒數 (OCR 語言退回重跑時會有兩個 ocr span)
+
+    @contextmanager
+    def span(self, job_id, name, **attrs):
+        started = time.perf_counter()
+        try:
+            yield attrs
+        finally:
+            self._current[name] = self._current.get(name, 0.0) + time.perf_counter() - started
+            self.attrs.update(attrs)
+
+    def frame_done(self):
+        for name, seconds in self._current.items():
+            self.stages.setdefault(name, []).append(seconds)
+        attrs = self.attrs
+        self._current, self.attrs = {}, {}
+        return attrs
+
+
+class StubBackend:
+    """本機假翻譯後端：固定延遲 (+抖動) 後回傳加上標記的原文"""
+    name = "stub"
+    label = "Stub"
+
+    def __init__(self, latency_ms=300, jitter_ms=50, seed=0):
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.rng = np.random.default_rng(seed)
+
+    def translate(self, text, on_partial=None):
+        time.sleep(max(0.0, self.latency + self.rng.uniform(-self.jitter, self.jitter)))
+        return f"<{text}>"
+
+
+def make_fixtures(out_dir=FIXTURE_DIR, count=24, seed=0):
+    """產生對話框風格的合成圖片：深色底、漸層、雜訊、白/黃字"""
+    rng = np.random.default_rng(seed)
+    os.makedirs(out_dir, exist_ok=True)
+    for i in range(count):
+        line = FIXTURE_LINES[i % len(FIXTURE_LINES)]
+        w, h = int(rng.integers(360, 800)), int(rng.integers(80, 200))
+        base = int(rng.integers(10, 70))
+        gradient = np.linspace(base, base + 40, w, dtype=np.float32)
+        img = np.repeat(np.repeat(gradient[None, :, None], h, axis=0), 3, axis=2)
+        img += rng.normal(0, 4, img.shape)
+        img = np.clip(img, 0, 255).astype(np.uint8)
+        color = (255, 255, 255) if i % 2 == 0 else (80, 220, 255)
+        scale = float(rng.uniform(0.6, 1.0))
+        cv2.putText(img, line, (12, h // 2), cv2.FONT_HERSHEY_SIMPLEX, scale, color, 2, cv2.LINE_AA)
+        cv2.imwrite(os.path.join(out_dir, f"fixture_{i:03d}.png"), img)
+    print(f"已產生 {count} 張圖片到 {out_dir}")
+
+
+def percentile(samples, p):
+    ordered = sorted(samples)
+    idx = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def summarize(samples):
+    if not samples:
+        return {"count": 0}
+    ms = [s * 1000 for s in samples]
+    return {
+        "count": len(ms),
+        "mean_ms": sum(ms) / len(ms),
+        "p50_ms": percentile(ms, 50),
+        "p95_ms": percentile(ms, 95),
+        "max_ms": max(ms),
+    }
+
+
+def run_benchmark(args):
+    paths = sorted(glob.glob(os.path.join(args.fixtures, "*.png")) + glob.glob(os.path.join(args.fixtures, "*.jpg")))
+    if not paths:
+        sys.exit(f"找不到圖片：{args.fixtures} (先執行 --make-fixtures)")
+    frames = [cv2.imread(p, cv2.IMREAD_GRAYSCALE) for p in paths]
+
+    engine = _SkippedOCREngine() if args.skip_ocr else create_ocr_engine(args.ocr_engine)
+    frame_cache = FrameOCRCache(
+        max_size=config.FRAME_CACHE_SIZE, threshold=config.FRAME_HASH_THRESHOLD,
+        pixel_delta=config.FRAME_VERIFY_PIXEL_DELTA, change_ratio=config.FRAME_VERIFY_CHANGE_RATIO,
+        thumb_size=config.FRAME_VERIFY_SIZE,
+    )
+    # 與即時模式相同：依上次辨識出的文字系統縮小 OCR 語言，結果不可靠時退回完整組合
+    languages = None
+    if config.OCR_LANG_AUTO:
+        languages = RegionLanguages(
+            config.OCR_LANG, config.OCR_SCRIPT_LANGS,
+            min_confidence=config.OCR_LANG_MIN_CONFIDENCE, reprobe_every=config.OCR_LANG_REPROBE_EVERY,
+        )
+    tmp_dir = tempfile.mkdtemp(prefix="bench_cache_")
+    cache = TranslationCache(os.path.join(tmp_dir, "cache.db"))
+    # 不給 tracer：假後端的 translate / route span 不寫進正式的 trace 檔，翻譯耗時由下面自己量
+    chain = BackendChain([StubBackend(args.latency_ms, args.jitter_ms)], policy="sequential", cache=cache,
+                         tracer=None)
+
+    stages = {name: [] for name in ("fingerprint", "detect", "preprocess", "ocr", "translate", "total")}
+    recorder = StageRecorder(stages)
+    lines = []   # 每張圖偵測到的文字行數
+    pixels = []  # 每張圖實際送進 OCR 的像素數
+    ocr_errors = 0
+    started = time.perf_counter()
+    for _ in range(args.rounds):
+        for i, gray in enumerate(frames):
+            t_total = time.perf_counter()
+
+            # 與即時、批次、影片模式共用同一條 指紋 -> 偵測 -> 前處理 -> OCR 路徑
+            try:
+                text = recognize_frame(engine, gray, frame_cache, recorder, i, region="benchmark",
+                                       languages=languages)
+            except Exception as e:
+                text = ""
+                ocr_errors += 1
+                if ocr_errors == 1:
+                    print(f"[WARN] OCR 失敗: {e}")
+            attrs = recorder.frame_done()
+            if "lines" in attrs:
+                lines.append(attrs["lines"])
+            if "pixels" in attrs:
+                pixels.append(attrs["pixels"])
+
+            # 沒有 OCR 時用檔案對應的台詞代替，讓翻譯快取也能被量測
+            if not text:
+                text = FIXTURE_LINES[len(stages["total"]) % len(FIXTURE_LINES)]
+            t = time.perf_counter()
+            chain.translate(text)
+            stages["translate"].append(time.perf_counter() - t)
+
+            stages["total"].append(time.perf_counter() - t_total)
+    elapsed = time.perf_counter() - started
+    if args.skip_ocr:
+        stages["ocr"] = []
+
+    if not args.skip_ocr:
+        engine.close()
+    cache_stats = cache.stats()
+    cache.close()
+
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "opencv": cv2.__version__,
+            "platform": platform.platform(),
+            "ocr_engine": engine.name,
+            "images": len(frames),
+            "rounds": args.rounds,
+            "stub_latency_ms": args.latency_ms,
+        },
+        "stages": {name: summarize(samples) for name, samples in stages.items()},
+        "throughput_fps": len(stages["total"]) / elapsed if elapsed else 0.0,
+        "ocr_errors": ocr_errors,
+        "text_lines_mean": sum(lines) / len(lines) if lines else 0.0,
+        "ocr_pixels_mean": sum(pixels) / len(pixels) if pixels else 0.0,
+        "frame_cache": {"hits": frame_cache.hits, "misses": frame_cache.misses},
+        "translation_cache": cache_stats,
+    }
+
+
+def compare(old, new):
+    """印出各階段 p50 / p95 的變化百分比 (正數 = 變慢)"""
+    print(f"{'stage':<12} {'metric':<8} {'old':>10} {'new':>10} {'change':>8}")
+    for stage, stats in new["stages"].items():
+        old_stats = old.get("stages", {}).get(stage, {})
+        for metric in ("p50_ms", "p95_ms"):
+            if metric not in stats or metric not in old_stats:
+                continue
+            a, b = old_stats[metric], stats[metric]
+            change = (b - a) / a * 100 if a else 0.0
+            print(f"{stage:<12} {metric:<8} {a:>10.2f} {b:>10.2f} {change:>+7.1f}%")
+    print(f"{'throughput':<12} {'fps':<8} {old.get('throughput_fps', 0):>10.2f} {new['throughput_fps']:>10.2f}")
+    print(f"{'cache':<12} {'hit':<8} {old.get('translation_cache', {}).get('hit_rate', 0):>10.2%} "
+          f"{new['translation_cache']['hit_rate']:>10.2%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="離線量測 OCR / 翻譯管線各階段延遲")
+    parser.add_argument("--make-fixtures", action="store_true", help="產生合成的測試圖片後結束")
+    parser.add_argument("--fixtures", default=FIXTURE_DIR, help="測試圖片資料夾 (也可放真實的遊戲截圖)")
+    parser.add_argument("--rounds", type=int, default=2, help="重複次數 (第二輪起可量測快取命中)")
+    parser.add_argument("--ocr-engine", default=None, help="覆寫 config.OCR_ENGINE")
+    parser.add_argument("--skip-ocr", action="store_true", help="只量測前處理與翻譯 (沒有安裝 Tesseract 時)")
+    parser.add_argument("--latency-ms", type=float, default=300, help="假翻譯後端的延遲")
+    parser.add_argument("--jitter-ms", type=float, default=50, help="假翻譯後端的延遲抖動")
+    parser.add_argument("--output", help="把結果寫成 JSON 檔")
+    parser.add_argument("--compare", help="與之前輸出的 JSON 結果比較")
+    args = parser.parse_args()
+
+    if args.make_fixtures:
+        make_fixtures(args.fixtures)
+        return
+
+    result = run_benchmark(args)
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(json.load(f), result)
+
+
+if __name__ == "__main__":
+    main()
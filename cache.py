@@ -0,0 +1,172 @@
+# cache 負責翻譯結果的快取：記憶體 LRU 在前、SQLite 持久層在後，重複的台詞不必再打 API。
+import hashlib
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+import config
+
+
+def normalize_text(text):
+    """正規化 OCR 文字 (全半形統一、壓縮空白)，讓同一句台詞得到同一個快取鍵"""
+    text = unicodedata.normalize("NFKC", text)
+    return " ".join(text.split())
+
+
+class TranslationCache:
+    """兩層翻譯快取：記憶體 LRU + SQLite，具備數量與時間淘汰機制"""
+
+    # 每寫入幾筆才做一次磁碟淘汰，避免每次寫入都掃表
+    EVICT_EVERY = 100
+
+    def __init__(self, db_path, memory_size=512, max_entries=20000, max_age_days=30):
+        self.memory_size = memory_size
+        self.max_entries = max_entries
+        self.max_age = max_age_days * 86400
+
+        self._memory = OrderedDict()  # key -> (translation, created)
+        self._lock = threading.Lock()
+        self._puts_since_evict = 0
+
+        # 命中統計
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        # Worker 在背景執行緒存取，所以關掉同執行緒檢查，改用自己的 lock 保護
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS translations ("
+            " key TEXT PRIMARY KEY,"
+            " backend TEXT NOT NULL,"
+            " source TEXT NOT NULL,"
+            " translation TEXT NOT NULL,"
+            " created REAL NOT NULL,"
+            " last_used REAL NOT NULL,"
+            " target_lang TEXT NOT NULL DEFAULT '',"
+            " model TEXT NOT NULL DEFAULT '')"
+        )
+        # 舊版資料庫沒有目標語言與模型欄位：補上欄位，舊紀錄留空 (不會被拿來預先填入翻譯記憶)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(translations)")}
+        for column in ("target_lang", "model"):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE translations ADD COLUMN {column} TEXT NOT NULL DEFAULT ''")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_last_used ON translations(last_used)")
+        self._conn.commit()
+        self._evict()
+
+    @staticmethod
+    def make_key(text, backend):
+        # 快取鍵 = 正規化原文 + 目標語言 + 模型 + 後端
+        raw = "\x1f".join([normalize_text(text), config.TARGET_LANG, config.MODEL_NAME, backend])
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def get(self, text, backend):
+        key = self.make_key(text, backend)
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                translation, created = entry
+                if now - created <= self.max_age:
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return translation
+                del self._memory[key]
+
+            row = self._conn.execute(
+                "SELECT translation, created FROM translations WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.max_age:
+                self.misses += 1
+                return None
+
+            translation, created = row
+            self._conn.execute("UPDATE translations SET last_used = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self._remember(key, translation, created)
+            self.disk_hits += 1
+            return translation
+
+    def put(self, text, backend, translation):
+        key = self.make_key(text, backend)
+        now = time.time()
+        with self._lock:
+            self._remember(key, translation, now)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO translations"
+                " (key, backend, source, translation, created, last_used, target_lang, model)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, backend, normalize_text(text), translation, now, now, config.TARGET_LANG, config.MODEL_NAME),
+            )
+            self._conn.commit()
+            self._puts_since_evict += 1
+            if self._puts_since_evict >= self.EVICT_EVERY:
+                self._evict()
+
+    def _remember(self, key, translation, created):
+        self._memory[key] = (translation, created)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def _evict(self):
+        # 先刪過期的，再依最後使用時間刪掉超出上限的部分
+        self._puts_since_evict = 0
+        self._conn.execute("DELETE FROM translations WHERE created < ?", (time.time() - self.max_age,))
+        self._conn.execute(
+            "DELETE FROM translations WHERE key IN ("
+            " SELECT key FROM translations ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+        self._conn.commit()
+
+    def recent_entries(self, limit):
+        """由舊到新回傳最近使用的 limit 筆 (原文, 後端, 譯文)，供翻譯記憶建立索引
+
+        只取目前 TARGET_LANG 與 MODEL_NAME 產生的紀錄 (與快取鍵一致)，換了目標語言後不會沿用舊語言的譯文。
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT source, backend, translation FROM translations"
+                " WHERE target_lang = ? AND model = ? ORDER BY last_used DESC LIMIT ?",
+                (config.TARGET_LANG, config.MODEL_NAME, limit),
+            ).fetchall()
+        return rows[::-1]
+
+    def stats(self):
+        total = self.memory_hits + self.disk_hits + self.misses
+        hit_rate = (self.memory_hits + self.disk_hits) / total if total else 0.0
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": hit_rate,
+            "memory_entries": len(self._memory),
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_translation_cache():
+    """取得全域共用的翻譯快取 (未啟用時回傳 None)"""
+    global _cache
+    if not config.CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = TranslationCache(
+                config.CACHE_DB_PATH,
+                memory_size=config.CACHE_MEMORY_SIZE,
+                max_entries=config.CACHE_MAX_ENTRIES,
+                max_age_days=config.CACHE_MAX_AGE_DAYS,
+            )
+        return _cache
@@ -5,6 +5,9 @@ import cv2
 from PySide6.QtWidgets import QApplication, QWidget
 from PySide6.QtCore import Qt, QTimer
 
+import config
+from geometry import save_calibration_profile, screen_key
+
 class CalibrationWindow(QWidget):
     def __init__(self):
         super().__init__()
@@ -92,7 +95,16 @@ class CalibrationWindow(QWidget):
                     offset_x = x - self.target_x
                     offset_y = y - self.target_y
                     print(f"\n(如果不是縮放問題) 建議 OFFSET 設定為: X={offset_x}, Y={offset_y}")
-                
+
+                # 4. 寫入校正檔：縮放用寬高推算 (不受偏移影響)，偏移 = 實際位置 - 縮放後的預期位置
+                scale = (scale_w + scale_h) / 2
+                offset_x = round(x - self.target_x * scale)
+                offset_y = round(y - self.target_y * scale)
+                key = screen_key(QApplication.primaryScreen())
+                save_calibration_profile(config.CALIBRATION_PROFILE_PATH, key, scale, offset_x, offset_y)
+                print(f"\n已將 {key} 的校正結果 (縮放 {scale:.2f}，偏移 X={offset_x}, Y={offset_y}) "
+                      f"寫入 {config.CALIBRATION_PROFILE_PATH}，下次啟動 main.py 時自動套用")
+
             else:
                 print("錯誤：在截圖中找不到紅色區塊。")
                 # 儲存圖片幫忙除錯
@@ -6,5 +6,128 @@ load_dotenv()
 
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 TARGET_LANG = "Traditional Chinese (繁體中文)"
+TARGET_SCRIPT = "hant"        # TARGET_LANG 的文字系統 (hant 繁體中文 / hans 簡體中文 / latin 拉丁字母)
+SKIP_SAME_LANGUAGE = True     # 辨識出的文字確定是目標的繁 / 簡寫法時直接顯示原文 (安裝 opencc 判斷較準；latin 無法分辨語言，一律翻譯)
 # 記得改成你實際可用的模型名稱
 MODEL_NAME = "gemini-2.0-flash" 
+
+# --- 翻譯快取 (記憶體 LRU + SQLite) ---
+CACHE_ENABLED = True
+CACHE_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "translation_cache.db")
+CACHE_MEMORY_SIZE = 512       # 記憶體層最多保留幾筆
+CACHE_MAX_ENTRIES = 20000     # 磁碟層最多保留幾筆 (依最後使用時間淘汰)
+CACHE_MAX_AGE_DAYS = 30       # 超過幾天的翻譯視為過期
+
+# --- 模糊翻譯記憶 (OCR 把同一句認得稍有不同時沿用舊譯文) ---
+FUZZY_MEMORY_ENABLED = True
+FUZZY_MEMORY_MAX_EDITS = 2    # 最多幾個易混淆字元 (c/e、i/l...) 不同仍直接沿用；其他任何差異都不沿用
+FUZZY_MEMORY_MAX_ENTRIES = 20000
+FUZZY_MEMORY_MIN_CHARS = 8    # 比這短的字串只接受完全相同 (避免短字串誤配)
+
+# --- 畫面指紋 (畫面沒變就跳過 OCR) ---
+FRAME_HASH_SIZE = 16          # dHash 邊長，指紋共 FRAME_HASH_SIZE^2 位元
+FRAME_HASH_THRESHOLD = 2      # 漢明距離在此以內的畫面才列為候選 (不同文字也可能指紋相同，候選還要再比對縮圖)
+FRAME_VERIFY_SIZE = 512       # 比對用縮圖的最長邊像素數
+FRAME_VERIFY_PIXEL_DELTA = 32 # 縮圖亮度差超過此值的像素才算改變
+FRAME_VERIFY_CHANGE_RATIO = 0.0002  # 縮圖改變的像素比例不超過此值才沿用 OCR 結果 (換掉一個字約 0.002)
+FRAME_CACHE_SIZE = 64         # 最多記住幾張畫面的 OCR 結果
+
+# --- 截圖座標校正 ---
+# calibrate.py 量測後寫入的各螢幕縮放比例與偏移；沒有檔案時依 Qt 回報的 DPI 縮放自動推算
+CALIBRATION_PROFILE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "calibration.json")
+
+# --- 監看模式 (持續取樣，畫面變化才翻譯) ---
+WATCH_SAMPLE_HZ = 4           # 每秒取樣次數
+WATCH_PIXEL_DELTA = 32        # 與上次翻譯時的畫面相比，亮度差超過此值的像素才算改變
+WATCH_CHANGE_RATIO = 0.0005   # 改變的像素比例超過此值才算「有變化」(換掉一個字約 0.002；指紋看不出只換一個單字)
+VIDEO_SETTLE_SAMPLES = 2      # 影片字幕模式：文字區連續幾個取樣不變才算一段 (逐字出現的文字不會被切成多段)
+WATCH_CPU_BUDGET = 0.05       # 取樣最多佔用單核心的比例 (5%)，太慢時自動降低取樣頻率
+
+# --- 文字穩定等待 (逐字出現的對話，等文字顯示完才 OCR) ---
+STABILITY_GATE = True
+STABILITY_SETTLE_MS = 150     # 文字區連續這麼久沒有新變化才開始 OCR
+STABILITY_MAX_WAIT_MS = 1500  # 最多等多久 (超過就用當下的畫面)
+STABILITY_INTERVAL_MS = 40    # 等待期間的取樣間隔
+STABILITY_PIXEL_DELTA = 32    # 亮度差超過此值的像素才算改變
+STABILITY_CHANGE_RATIO = 0.0002  # 改變的像素比例超過此值才算畫面有變化
+STABILITY_HISTORY_SIZE = 8    # 等待期間記住幾張不同的畫面 (閃爍的提示圖示與其中一張相同就不算新變化)
+
+# --- Gemini 串流輸出 ---
+STREAM_TRANSLATION = True     # 邊生成邊顯示譯文，長段對話可以更快看到第一句
+STREAM_UPDATE_INTERVAL_MS = 80  # 部分譯文最快多久更新一次畫面
+
+# --- 翻譯後端策略 ---
+# sequential: Gemini 失敗才換 Google (原本的行為)
+# hedge: Gemini 超過 HEDGE_DELAY_MS 還沒回來就同時啟動 Google，取先成功的
+# race: 兩者同時啟動，取先成功的
+TRANSLATION_POLICY = "hedge"
+HEDGE_DELAY_MS = 1500
+BACKEND_TIMEOUTS = {"gemini": 10.0, "local": 5.0, "google": 6.0}  # 各後端逾時秒數：逾時的結果直接忽略，Gemini / Google 的 HTTP 請求也以此中斷
+# 後端呼叫順序 (越前面優先權越高，不想用的後端直接移除)
+# gemini: Gemini API / local: 本機 CPU 翻譯 (Argos Translate，不需網路) / google: Google Translator
+BACKEND_ORDER = ["gemini", "local", "google"]
+LOCAL_SOURCE_LANG = "en"      # 本機模型的來源語言 (需先安裝對應的 Argos 語言包)；其他語言的文字不會送給本機模型
+LOCAL_TARGET_LANG = "zh"      # Argos 只輸出簡體中文，TARGET_SCRIPT 為 hant 時需安裝 opencc 轉成繁體 (否則略過本機後端)
+
+# --- 後端健康狀態與自動路由 ---
+ADAPTIVE_ROUTING = True       # 依觀察到的延遲與成功率重新排序後端 (False = 固定照 BACKEND_ORDER)
+ROUTING_PRIORITY_PENALTY_SEC = 2.0  # BACKEND_ORDER 每往後一位視為多花幾秒 (越大越照設定順序)
+ROUTING_PRIOR_LATENCY = 1.0   # 還沒有資料的後端先假設的延遲 (秒)
+# 預期花費 = EWMA 延遲 x (1 - 錯誤率) + 逾時秒數 x 錯誤率
+HEALTH_EWMA_ALPHA = 0.3       # EWMA 平滑係數，越大越看重最近幾次
+CIRCUIT_FAILURE_THRESHOLD = 3 # 連續失敗幾次就開啟斷路器
+CIRCUIT_COOLDOWN_SEC = 30     # 斷路器開啟後略過多久，之後放行一次試探呼叫
+
+# --- OCR 引擎 ---
+# tesserocr: 行程內常駐 Tesseract (最快，需 pip install tesserocr)
+# paddle: 常駐 PaddleOCR 模型
+# pytesseract: 每次呼叫 tesseract.exe 子程序 (其他引擎無法使用時的備援)
+OCR_ENGINE = "tesserocr"
+OCR_LANG = "eng+chi_tra"
+OCR_PSM = 6
+TESSERACT_CMD = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
+TESSDATA_PATH = r'C:\Program Files\Tesseract-OCR\tessdata'
+PADDLE_LANG = "chinese_cht"
+
+# --- 依區域自動縮小 OCR 語言 (單一語言模型比 eng+chi_tra 快很多) ---
+OCR_LANG_AUTO = True
+OCR_SCRIPT_LANGS = {"latin": "eng", "han": "chi_tra"}  # 文字系統 -> Tesseract 語言 (需包含在 OCR_LANG 中)
+OCR_LANG_MIN_CONFIDENCE = 60  # 縮小語言後平均信心低於此值 (0~100) 就改用完整的 OCR_LANG 重新辨識
+OCR_LANG_REPROBE_EVERY = 30   # 每個區域每辨識幾次就用完整語言重新確認一次 (遊戲切換語言時跟著改)
+
+# --- 階段追蹤 (span) ---
+TRACE_ENABLED = True
+TRACE_LOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs", "pipeline_trace.jsonl")
+TRACE_MAX_BYTES = 5 * 1024 * 1024  # 單檔上限，超過就輪替
+TRACE_BACKUP_COUNT = 3
+
+# --- 文字行偵測 (只 OCR 有文字的區塊) ---
+TEXT_DETECTION = True
+TARGET_GLYPH_HEIGHT = 32      # 裁切後把行高放大到約這個像素數 (取代固定 2 倍)
+
+# --- 多區域 ---
+REGION_NAMES = ["對話"]       # 啟動時建立的區域 (之後可用結果視窗的 + 按鈕新增)
+OCR_WORKERS = os.cpu_count() or 4  # 多區域平行 OCR 的執行緒數
+UNION_GRAB_MAX_RATIO = 4.0    # 各區域聯集面積超過總面積幾倍時，改為逐一截圖 (避免跨螢幕抓整片)
+CAPTURE_RING_SLOTS = 3        # 截圖灰階影格的環狀緩衝區槽位數 (最近幾張影格保持有效；尺寸不變時不再配置記憶體)
+
+# --- 批次翻譯 (多段文字合併成一次 Gemini 請求) ---
+BATCH_TRANSLATION = True
+BATCH_WINDOW_MS = 30          # 收集視窗：第一段進來後最多再等多久湊同一批
+BATCH_MAX_SEGMENTS = 8        # 一批最多幾段
+BATCH_MAX_CHARS = 4000        # 一批最多幾個字元 (約略控制 token 數)
+
+# --- 逐行增量翻譯 (聊天框 / 紀錄捲動時只翻新出現的行) ---
+LINE_INCREMENTAL = True      # 其他區域只在畫面捲動 (上一次的最後幾行是這次的開頭) 時才逐行翻譯，否則整段翻譯
+LINE_INCREMENTAL_REGIONS = [] # 一律逐行翻譯的區域名稱 (例如 "紀錄"、"聊天")
+LINE_MATCH_MAX_EDITS = 2      # 與上一次某行只差幾個易混淆字元 (c/e、i/l...) 仍視為同一行；其他差異一律重新翻譯
+LINE_SCROLL_MIN_OVERLAP = 2   # 上一次結尾與這次開頭至少連續幾行相同才算捲動
+LINE_MEMORY_SIZE = 500        # 每個區域最多記住幾行的譯文
+
+# --- 本機服務 (其他程式透過 HTTP 共用已暖機的 OCR 與翻譯，見 local_server.py) ---
+LOCAL_SERVER_ENABLED = False
+LOCAL_SERVER_HOST = "127.0.0.1"  # 只接受本機連線
+LOCAL_SERVER_PORT = 8765
+LOCAL_SERVER_OCR_WORKERS = 1  # 本機服務專用的 OCR 引擎數 (啟動時暖機；同時的請求超過此數就排隊)
+LOCAL_SERVER_MAX_BYTES = 10 * 1024 * 1024  # 單一請求內容上限 (圖片檔)
+LOCAL_SERVER_WARMUP_TIMEOUT = 30  # 引擎還在暖機時，請求最多等幾秒
@@ -0,0 +1,63 @@
+# frame_buffers 負責截圖與前處理的緩衝區重複使用：直接讀 mss 的原始 BGRA 記憶體，灰階、放大、二值圖都寫進預先配置的陣列。
+# 持續取樣 (監看模式、等待文字穩定) 時，尺寸不變的影格不再每張配置新記憶體。
+import cv2
+import numpy as np
+
+
+def bgra_view(sct_img):
+    """不複製地把 mss 截圖的原始緩衝區看成 (高, 寬, 4) 的 BGRA 陣列 (只在 sct_img 還在時有效)"""
+    return np.frombuffer(sct_img.raw, dtype=np.uint8).reshape(sct_img.height, sct_img.width, 4)
+
+
+class FrameRing:
+    """每個鍵 (區域名稱、前處理的第幾行...) 各有 slots 個輪流使用的緩衝區
+
+    最近 slots 張寫入的影格都保持有效，可以直接拿來比對畫面變化；
+    尺寸不變時只會覆寫舊槽位，選取框縮放 (尺寸改變) 時才重新配置。
+    只能在單一執行緒中使用。
+    """
+
+    def __init__(self, slots=4):
+        self.slots = slots
+        self._rings = {}  # 鍵 -> [緩衝區清單, 下一個槽位, 有效張數, 影格尺寸]
+        self.allocations = 0
+
+    def acquire(self, key, shape):
+        """取得下一個槽位 (內容是舊影格，呼叫端要整張覆寫)"""
+        ring = self._rings.get(key)
+        if ring is None:
+            ring = self._rings[key] = [[None] * self.slots, 0, 0, shape]
+        buffers, index, count, last_shape = ring
+        if last_shape != shape:
+            count = 0  # 尺寸改變後，舊尺寸的影格不再拿來比對
+        buf = buffers[index]
+        if buf is None or buf.shape != shape:
+            buf = buffers[index] = np.empty(shape, dtype=np.uint8)
+            self.allocations += 1
+        ring[1:] = [(index + 1) % self.slots, min(count + 1, self.slots), shape]
+        return buf
+
+    def keep(self, key, image):
+        """把影格複製進下一個槽位 (來源可以是聯集截圖中切出的非連續區塊)"""
+        buf = self.acquire(key, image.shape)
+        np.copyto(buf, image)
+        return buf
+
+    def recent(self, key):
+        """最近寫入的有效影格，由新到舊"""
+        ring = self._rings.get(key)
+        if ring is None:
+            return []
+        buffers, index, count, _ = ring
+        return [buffers[(index - 1 - i) % self.slots] for i in range(count)]
+
+    def reset(self, key=None):
+        """讓某個鍵 (不指定時為全部) 的影格失效，緩衝區保留下次沿用"""
+        for k, ring in self._rings.items():
+            if key is None or k == key:
+                ring[2] = 0
+
+    def grayscale(self, key, sct_img):
+        """mss 截圖 -> 灰階，直接從原始緩衝區轉換並寫入槽位 (不經過 np.array 複製)"""
+        bgra = bgra_view(sct_img)
+        return cv2.cvtColor(bgra, cv2.COLOR_BGRA2GRAY, dst=self.acquire(key, bgra.shape[:2]))
@@ -0,0 +1,89 @@
+# frame_hash 負責計算截圖的指紋 (差異雜湊 dHash)，畫面沒變時就直接沿用上次的 OCR 結果。
+import threading
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+
+def frame_fingerprint(gray, hash_size=16):
+    """把灰階圖縮成 (hash_size+1) x hash_size，比較左右相鄰像素得到 hash_size^2 位元的指紋"""
+    small = cv2.resize(gray, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    diff = small[:, 1:] > small[:, :-1]
+    return int.from_bytes(np.packbits(diff).tobytes(), "big")
+
+
+def hamming_distance(a, b):
+    return bin(a ^ b).count("1")
+
+
+def changed_ratio(a, b, pixel_delta=32):
+    """兩張同尺寸灰階圖中，亮度差超過 pixel_delta 的像素比例 (比指紋更敏感，多出一個字就看得出來)"""
+    if a.shape != b.shape:
+        return 1.0
+    return np.count_nonzero(cv2.absdiff(a, b) > pixel_delta) / a.size
+
+
+def frame_thumbnail(gray, max_side=512):
+    """等比縮小到最長邊不超過 max_side 的灰階縮圖 (INTER_AREA 平均，多出一個字仍看得出差異)，用來確認是否為同一畫面"""
+    scale = max_side / max(gray.shape)
+    if scale >= 1:
+        return gray.copy()
+    return cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+
+class FrameOCRCache:
+    """指紋 -> OCR 結果的有限快取
+
+    指紋只用來找候選：不同文字可能算出相同的 dHash (例如 save -> leave)，
+    所以候選還要再用縮圖的 changed_ratio 確認，改變的像素比例不超過 change_ratio 才視為同一張。
+    """
+
+    def __init__(self, max_size=64, threshold=2, pixel_delta=32, change_ratio=0.0002, thumb_size=512):
+        self.max_size = max_size
+        self.threshold = threshold
+        self.pixel_delta = pixel_delta
+        self.change_ratio = change_ratio
+        self.thumb_size = thumb_size
+        self._entries = OrderedDict()  # (fingerprint, 尺寸) -> (縮圖, text)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, fingerprint, gray):
+        thumb = frame_thumbnail(gray, self.thumb_size)
+        with self._lock:
+            key = self._find(fingerprint, gray.shape, thumb)
+            if key is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key][1]
+
+    def contains(self, fingerprint, gray):
+        """畫面是否已經有 OCR 結果 (不計入命中統計，也不影響淘汰順序)"""
+        thumb = frame_thumbnail(gray, self.thumb_size)
+        with self._lock:
+            return self._find(fingerprint, gray.shape, thumb) is not None
+
+    def _find(self, fingerprint, shape, thumb):
+        # 尺寸相同且指紋距離在門檻內的都是候選，由近到遠逐一用縮圖確認
+        candidates = sorted(
+            (hamming_distance(fp, fingerprint), (fp, sh))
+            for (fp, sh) in self._entries
+            if sh == shape and hamming_distance(fp, fingerprint) <= self.threshold
+        )
+        for _, key in candidates:
+            if changed_ratio(self._entries[key][0], thumb, self.pixel_delta) <= self.change_ratio:
+                return key
+        return None
+
+    def store(self, fingerprint, gray, text):
+        key = (fingerprint, gray.shape)
+        thumb = frame_thumbnail(gray, self.thumb_size)
+        with self._lock:
+            self._entries[key] = (thumb, text)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
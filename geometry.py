@@ -0,0 +1,149 @@
+# geometry 負責 Qt 邏輯座標 -> mss 實體像素的換算：每個螢幕的轉換只算一次並快取，螢幕設定改變時才重算。
+# 轉換可由 calibrate.py 量測後存成校正檔 (calibration.json)，覆寫自動推算的縮放比例與偏移。
+import json
+import os
+from collections import namedtuple
+
+from PySide6.QtCore import QObject, Signal
+from PySide6.QtGui import QGuiApplication
+
+import config
+
+# 單一螢幕的轉換：實體座標 = 實體原點 + 偏移 + (邏輯座標 - 邏輯原點) * 縮放
+ScreenTransform = namedtuple("ScreenTransform", [
+    "key", "qt_rect", "origin_x", "origin_y", "scale", "offset_x", "offset_y", "calibrated",
+])
+
+
+def screen_key(screen):
+    """校正檔中代表一個螢幕的鍵 (螢幕名稱 + 邏輯解析度，換了解析度就要重新校正)"""
+    geo = screen.geometry()
+    return f"{screen.name()}@{geo.width()}x{geo.height()}"
+
+
+def load_calibration_profile(path):
+    """讀取校正檔 {螢幕鍵: {"scale", "offset_x", "offset_y"}}，沒有檔案時回傳空 dict"""
+    if not path or not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"[WARN] 無法讀取校正檔 {path}: {e}")
+        return {}
+
+
+def save_calibration_profile(path, key, scale, offset_x, offset_y):
+    """把一個螢幕的量測結果寫入校正檔 (保留其他螢幕的紀錄)"""
+    profile = load_calibration_profile(path)
+    profile[key] = {"scale": round(scale, 4), "offset_x": int(offset_x), "offset_y": int(offset_y)}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(profile, f, ensure_ascii=False, indent=2)
+    return profile
+
+
+class GeometryService(QObject):
+    """在 GUI 執行緒上換算選取框的實體像素區域
+
+    各螢幕的轉換第一次用到時才建立 (需要 mss 讀取螢幕排列)，之後一直沿用；
+    新增 / 移除螢幕、主螢幕切換、解析度或 DPI 改變時清掉快取並送出 changed。
+    """
+    changed = Signal()
+
+    def __init__(self, profile_path=None, parent=None):
+        super().__init__(parent)
+        self.profile_path = profile_path or config.CALIBRATION_PROFILE_PATH
+        self.profile = load_calibration_profile(self.profile_path)
+        if self.profile:
+            print(f"[INFO] 已載入螢幕校正檔：{len(self.profile)} 個螢幕")
+        self._transforms = None  # [ScreenTransform, ...]，第一個是主螢幕
+
+        app = QGuiApplication.instance()
+        app.screenAdded.connect(self._on_screen_added)
+        app.screenRemoved.connect(self.invalidate)
+        app.primaryScreenChanged.connect(self.invalidate)
+        for screen in app.screens():
+            self._watch_screen(screen)
+
+    def _watch_screen(self, screen):
+        screen.geometryChanged.connect(self.invalidate)
+        screen.logicalDotsPerInchChanged.connect(self.invalidate)
+
+    def _on_screen_added(self, screen):
+        self._watch_screen(screen)
+        self.invalidate()
+
+    def invalidate(self, *args):
+        if self._transforms is not None:
+            print("[INFO] 螢幕設定改變，重新計算截圖座標")
+        self._transforms = None
+        self.changed.emit()
+
+    def transforms(self):
+        if self._transforms is None:
+            self._transforms = self._build_transforms()
+        return self._transforms
+
+    def _build_transforms(self):
+        import mss
+
+        try:
+            with mss.mss() as sct:
+                monitors = sct.monitors
+        except Exception as e:
+            print(f"[WARN] 無法取得螢幕排列，改用 DPI 縮放推算截圖座標: {e}")
+            monitors = []
+        primary = QGuiApplication.primaryScreen()
+        transforms = []
+        # 沿用原本的對應方式：Qt 的第 i 個螢幕對應 mss 的 monitors[i + 1]
+        for index, screen in enumerate(QGuiApplication.screens()):
+            geo = screen.geometry()
+            key = screen_key(screen)
+            calibration = self.profile.get(key)
+            if index + 1 < len(monitors):
+                origin_x, origin_y = monitors[index + 1]["left"], monitors[index + 1]["top"]
+            else:
+                # 找不到對應的 mss 螢幕時，退回直接把邏輯座標乘上縮放比例
+                origin_x, origin_y = geo.x() * screen.devicePixelRatio(), geo.y() * screen.devicePixelRatio()
+            transform = ScreenTransform(
+                key=key,
+                qt_rect=(geo.x(), geo.y(), geo.width(), geo.height()),
+                origin_x=origin_x,
+                origin_y=origin_y,
+                scale=calibration["scale"] if calibration else screen.devicePixelRatio(),
+                offset_x=calibration.get("offset_x", 0) if calibration else 0,
+                offset_y=calibration.get("offset_y", 0) if calibration else 0,
+                calibrated=calibration is not None,
+            )
+            if screen == primary:
+                transforms.insert(0, transform)
+            else:
+                transforms.append(transform)
+            print(f"[DEBUG] 螢幕 {key}: 縮放 {transform.scale}{' (校正檔)' if transform.calibrated else ''}")
+        return transforms
+
+    def transform_for(self, region):
+        """選取框中心所在螢幕的轉換 (不在任何螢幕上時用主螢幕)"""
+        transforms = self.transforms()
+        x, y, w, h = region
+        center_x, center_y = x + w / 2, y + h / 2
+        for transform in transforms:
+            sx, sy, sw, sh = transform.qt_rect
+            if sx <= center_x < sx + sw and sy <= center_y < sy + sh:
+                return transform
+        return transforms[0]
+
+    def physical_rect(self, region):
+        """Qt 邏輯座標 (x, y, w, h) -> mss 使用的實體像素區域"""
+        x, y, w, h = region
+        t = self.transform_for(region)
+        return {
+            "top": int(t.origin_y + t.offset_y + (y - t.qt_rect[1]) * t.scale),
+            "left": int(t.origin_x + t.offset_x + (x - t.qt_rect[0]) * t.scale),
+            "width": int(w * t.scale),
+            "height": int(h * t.scale),
+        }
+
+    def physical_regions(self, regions):
+        """[(名稱, (x, y, w, h)), ...] -> [(名稱, 實體像素區域), ...]"""
+        return [(name, self.physical_rect(region)) for name, region in regions]
@@ -1,11 +1,17 @@
 # overlay  (選取框)
-from PySide6.QtWidgets import QWidget, QSizeGrip, QVBoxLayout
-from PySide6.QtCore import Qt
+from PySide6.QtWidgets import QWidget, QSizeGrip, QVBoxLayout, QLabel, QMenu
+from PySide6.QtCore import Qt, Signal
 
 class SelectionWindow(QWidget):
-    def __init__(self, parent=None):
+    # 選取框移動或縮放後送出新的 (x, y, w, h)
+    region_changed = Signal(tuple)
+    # 使用者從右鍵選單要求移除這個區域 (送出區域名稱)
+    remove_requested = Signal(str)
+
+    def __init__(self, parent=None, name="對話"):
         super().__init__(parent)
-        self.setWindowTitle("翻譯區域")
+        self.name = name
+        self.setWindowTitle(f"翻譯區域 - {name}")
         self.setWindowFlags(Qt.WindowStaysOnTopHint | Qt.FramelessWindowHint | Qt.Tool)
         
         # 改成：不使用像素級透明，改用視窗級透明 (比較穩定)
@@ -21,6 +27,11 @@ class SelectionWindow(QWidget):
         self.sizegrip.setStyleSheet("background-color: transparent; width: 20px; height: 20px;")
         self.sizegrip.raise_() # 確保在最上層
 
+        # [新增] 左上角顯示區域名稱，多區域時方便辨認
+        self.lbl_name = QLabel(name, self)
+        self.lbl_name.setStyleSheet("background-color: transparent; border: none; color: white; font-weight: bold;")
+        self.lbl_name.move(6, 4)
+
         self._drag_pos = None
 
     # [新增] 保持 SizeGrip 在右下角
@@ -29,6 +40,11 @@ class SelectionWindow(QWidget):
         sz = self.sizegrip.sizeHint()
         self.sizegrip.move(rect.width() - sz.width(), rect.height() - sz.height())
         super().resizeEvent(event)
+        self.region_changed.emit(self.get_region())
+
+    def moveEvent(self, event):
+        super().moveEvent(event)
+        self.region_changed.emit(self.get_region())
 
     def mousePressEvent(self, event):
         if event.button() == Qt.LeftButton:
@@ -47,6 +63,12 @@ class SelectionWindow(QWidget):
 
     def mouseReleaseEvent(self, event):
         self._drag_pos = None
+
+    def contextMenuEvent(self, event):
+        menu = QMenu(self)
+        action_remove = menu.addAction("移除此區域")
+        if menu.exec(event.globalPos()) == action_remove:
+            self.remove_requested.emit(self.name)
     
     def get_region(self):
         geo = self.geometry()
@@ -2,19 +2,114 @@
 
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QLabel, QPushButton, 
                                QTextEdit, QHBoxLayout, QApplication, QSizeGrip)
-from PySide6.QtCore import Qt, Slot
+from PySide6.QtCore import Qt, Slot, QMetaObject
+import threading
+import time
 from .overlay import SelectionWindow
-from workers import OCRTranslateWorker
+import config
+from cache import get_translation_cache
+from tracing import get_tracer
+from startup import get_startup_report, preload_modules
+from geometry import GeometryService
 import keyboard # 記得 import 這個，如果 exit_app 有用到
 
 class ResultWindow(QWidget):
     def __init__(self):
         super().__init__()
-        self.selection_win = SelectionWindow() 
+        self.watcher = None
+        # 區域名稱 -> 選取框；第一個區域是主要的對話框區域
+        self.regions = {}
+        for name in config.REGION_NAMES:
+            self._create_region(name)
+        self.selection_win = next(iter(self.regions.values()))
+        # 選取框的實體像素區域只在移動、縮放或螢幕設定改變後重算，按 F9 時直接使用
+        self.geometry_service = GeometryService(parent=self)
+        self.geometry_service.changed.connect(self._on_region_changed)
+        self._physical_regions = None
+        # workers 及其依賴 (cv2、OCR、Gemini SDK...) 在視窗出現後才於背景載入
         self.worker = None
+        self._pending_trigger = False  # worker 還沒建立前就按了 F9
+        self._busy = False
+        self._latest_job_id = None   # 最新送出的工作；較舊工作的結果一律忽略
+        self._watch_pending = False  # 翻譯進行中時又偵測到變化，等這次結束再補一次
         self.init_ui()
-        self.selection_win.show()
+        for win in self.regions.values():
+            win.show()
         self.show()
+        get_startup_report().milestone("視窗顯示")
+        threading.Thread(target=self._preload, name="preload", daemon=True).start()
+
+    # --- 背景載入與暖機 ---
+    def _preload(self):
+        preload_modules()
+        QMetaObject.invokeMethod(self, "_start_worker", Qt.QueuedConnection)
+
+    @Slot()
+    def _start_worker(self):
+        from workers import OCRTranslateWorker  # 已在背景載入完成，這裡不會再花時間
+        self.worker = OCRTranslateWorker()
+        self.worker.result_ready.connect(self.handle_result)
+        self.worker.partial_result.connect(self.handle_partial)
+        self.worker.error_occurred.connect(self.handle_error)
+        self.worker.job_finished.connect(self.on_job_finished)
+        self.worker.ready.connect(self.on_worker_ready)
+        self.worker.start()
+        if self._pending_trigger:
+            # 工作會排在暖機之後，暖機一結束就開始處理
+            self._pending_trigger = False
+            self.trigger_translation()
+
+    @Slot()
+    def on_worker_ready(self):
+        report = get_startup_report()
+        report.milestone("暖機完成")
+        print(report.format())
+        if not self._busy and not self.watcher:
+            self.lbl_status.setText(
+                f"按 F9 翻譯選取區 (啟動 {report.elapsed('視窗顯示'):.1f}s · 就緒 {report.elapsed('暖機完成'):.1f}s)")
+
+    # --- 多區域管理 ---
+    def _create_region(self, name):
+        win = SelectionWindow(name=name)
+        offset = 30 * len(self.regions)
+        win.move(win.x() + offset, win.y() + offset)
+        win.region_changed.connect(self._on_region_changed)
+        win.remove_requested.connect(self.remove_region)
+        self.regions[name] = win
+        return win
+
+    def region_list(self):
+        return [(name, win.get_region()) for name, win in self.regions.items()]
+
+    @Slot()
+    def add_region(self):
+        index = len(self.regions) + 1
+        while f"區域{index}" in self.regions:
+            index += 1
+        win = self._create_region(f"區域{index}")
+        win.show()
+        self._on_region_changed()
+
+    @Slot(str)
+    def remove_region(self, name):
+        if len(self.regions) <= 1 or name not in self.regions:
+            return  # 至少保留一個區域
+        win = self.regions.pop(name)
+        win.close()
+        win.deleteLater()
+        self.selection_win = next(iter(self.regions.values()))
+        self._on_region_changed()
+
+    def physical_region_list(self):
+        if self._physical_regions is None:
+            self._physical_regions = self.geometry_service.physical_regions(self.region_list())
+        return self._physical_regions
+
+    def _on_region_changed(self, *args):
+        # 任一選取框移動、縮放、新增或移除 (或螢幕設定改變) 時作廢實體座標，並同步給監看執行緒
+        self._physical_regions = None
+        if self.watcher:
+            self.watcher.set_regions(self.physical_region_list())
 
     def init_ui(self):
         
@@ -39,8 +134,18 @@ class ResultWindow(QWidget):
         self.btn_close = QPushButton("X")
         self.btn_close.setFixedSize(24, 24)
         self.btn_close.clicked.connect(self.exit_app) # 連接到 exit_app
+        self.btn_watch = QPushButton("監看")
+        self.btn_watch.setCheckable(True)
+        self.btn_watch.setFixedSize(48, 24)
+        self.btn_watch.toggled.connect(self.set_watch_mode)
+        self.btn_add_region = QPushButton("+")
+        self.btn_add_region.setToolTip("新增翻譯區域 (在區域上按右鍵可移除)")
+        self.btn_add_region.setFixedSize(24, 24)
+        self.btn_add_region.clicked.connect(self.add_region)
         top_layout.addWidget(self.lbl_status)
         top_layout.addStretch()
+        top_layout.addWidget(self.btn_add_region)
+        top_layout.addWidget(self.btn_watch)
         top_layout.addWidget(self.btn_close)
         
         self.text_src = QTextEdit()
@@ -96,55 +201,112 @@ class ResultWindow(QWidget):
 
     @Slot()
     def trigger_translation(self):
-        if self.worker and self.worker.isRunning():
+        if self.worker is None:
+            self._pending_trigger = True
+            self.lbl_status.setText("載入中，完成後自動翻譯...")
             return
+        # 最新的一次按鍵優先：進行中的舊工作會在下一個階段邊界被 worker 取消
         self.lbl_status.setText("辨識中...")
-        region = self.selection_win.get_region()
-        self.worker = OCRTranslateWorker(region)
-        
-        # [新增] 獲取綠色視窗所在的螢幕縮放比例
-        # windowHandle() 可能為 None，如果視窗還沒完全顯示
-        win_handle = self.selection_win.windowHandle()
-        if win_handle:
-            screen = win_handle.screen()
-            scale = screen.devicePixelRatio() # 獲取 DPI 縮放 (例如 1.25 或 1.5)
-        else:
-            # fallback: 用應用程式主螢幕的縮放
-            scale = QApplication.primaryScreen().devicePixelRatio()
-
-        print(f"[DEBUG] Detected Window Scale Factor: {scale}")
+        # 座標換算在介面執行緒做，量測 (以及是否沿用快取的區域) 隨工作交給 worker 寫進 trace
+        geometry = {"start": time.time(), "cached": self._physical_regions is not None}
+        started = time.perf_counter()
+        regions = self.physical_region_list()
+        geometry["duration"] = time.perf_counter() - started
 
-        # [修改] 傳入 scale
-        self.worker = OCRTranslateWorker(region, scale_factor=scale)
-
-        self.worker.result_ready.connect(self.handle_result)
-        self.worker.error_occurred.connect(self.handle_error)
-        self.worker.finished.connect(self.on_worker_finished)
-        self.worker.start()
+        # 交給常駐 worker 處理，不再每次建立新的執行緒
+        self._busy = True
+        self._latest_job_id = self.worker.submit(regions, geometry)
 
     # [補上缺失的方法]
-    @Slot(str, str)
-    def handle_result(self, src, trans):
+    @Slot(int, str, str)
+    def handle_result(self, job_id, src, trans):
+        if job_id != self._latest_job_id:
+            get_tracer().job_cancelled(job_id)
+            return
         self.text_src.setPlainText(src)
         self.text_trans.setPlainText(trans)
-        self.lbl_status.setText("翻譯完成")
+        get_tracer().job_delivered(job_id)
+        self.lbl_status.setText(f"翻譯完成 {self._metrics_summary()}")
 
-    @Slot(str)
-    def handle_error(self, err):
+    @Slot(int, str, str)
+    def handle_partial(self, job_id, src, partial):
+        # 串流模式：先顯示已收到的部分譯文，完整結果由 handle_result 覆蓋
+        if job_id != self._latest_job_id:
+            return
+        self.text_src.setPlainText(src)
+        self.text_trans.setPlainText(partial)
+        self.lbl_status.setText("翻譯中...")
+
+    @Slot(int, str)
+    def handle_error(self, job_id, err):
+        if job_id != self._latest_job_id:
+            get_tracer().job_cancelled(job_id)
+            return
+        get_tracer().job_delivered(job_id, status="error")
         self.lbl_status.setText("錯誤")
         self.text_trans.setPlainText(err)
+
+    def _metrics_summary(self):
+        # 狀態列的精簡摘要：本次延遲 / 滾動 p95 / 翻譯快取命中率
+        summary = get_tracer().summary()
+        parts = []
+        if summary["last"] is not None:
+            parts.append(f"{summary['last']:.2f}s")
+        if summary["p95"] is not None:
+            parts.append(f"p95 {summary['p95']:.2f}s")
+        cache = get_translation_cache()
+        if cache:
+            parts.append(f"快取 {cache.stats()['hit_rate']:.0%}")
+        return f"({' · '.join(parts)})" if parts else ""
         
+    @Slot(int)
+    def on_job_finished(self, job_id):
+        if job_id != self._latest_job_id:
+            return  # 被取代的舊工作，最新的工作還在進行
+        self._busy = False
+        if self._watch_pending and self.watcher:
+            self._watch_pending = False
+            self.trigger_translation()
+
+    # --- 監看模式 ---
     @Slot()
-    def on_worker_finished(self):
-        self.worker = None
+    def toggle_watch_mode(self):
+        self.btn_watch.toggle()
+
+    @Slot(bool)
+    def set_watch_mode(self, enabled):
+        if enabled and not self.watcher:
+            from workers import RegionWatcher
+            self.watcher = RegionWatcher(self.physical_region_list())
+            self.watcher.change_detected.connect(self.on_watch_change)
+            self.watcher.start()
+            self.lbl_status.setText("監看模式中...")
+        elif not enabled and self.watcher:
+            self.watcher.stop()
+            self.watcher.wait()
+            self.watcher = None
+            self._watch_pending = False
+            self.lbl_status.setText("按 F9 翻譯選取區")
+
+    @Slot()
+    def on_watch_change(self):
+        # 同一時間只允許一個翻譯在進行，其餘的變化合併成一次補跑
+        if self._busy:
+            self._watch_pending = True
+            return
+        self.trigger_translation()
 
     @Slot()
     def exit_app(self):
+        self.set_watch_mode(False)
+        # 不強制終止執行緒：worker 在下一個階段邊界停下並自行釋放截圖、OCR 與網路資源
         if self.worker:
-            self.worker.terminate()
+            self.worker.stop()
+            self.worker.wait()
         try:
             keyboard.unhook_all()
         except:
             pass
-        self.selection_win.close()
+        for win in self.regions.values():
+            win.close()
         QApplication.instance().quit()
@@ -0,0 +1,103 @@
+# incremental 負責逐行的增量翻譯：聊天框或紀錄捲動時，只翻譯新出現或改變的行。
+import difflib
+from collections import OrderedDict
+
+from translation_memory import glyph_edits, match_key
+
+
+def split_lines(text):
+    return [line.strip() for line in text.splitlines() if line.strip()]
+
+
+class LineTracker:
+    """記住某個區域上一次的 OCR 行與每行的譯文
+
+    align() 以 difflib 對齊新舊兩次的行序列 (比對 match_key，空白、標點與常見誤認字元不影響)：相同的行直接沿用譯文；
+    被替換的區段只在兩行差異全是易混淆字元 (最多 max_edits 個) 時沿用，意思可能不同的行一律重新翻譯。
+    """
+
+    def __init__(self, max_edits=2, memory_size=500, min_overlap=2):
+        self.max_edits = max_edits
+        self.min_overlap = min_overlap
+        self.memory_size = memory_size
+        self._prev_lines = []     # 上一次的行 (match_key)
+        self._prev_translations = []  # 整段翻譯時沒有逐行譯文，對應位置為 None
+        self._memory = OrderedDict()  # match_key -> 譯文 (捲回來的舊行也能沿用)
+        self.label = None         # 最近一次實際翻譯所用的後端標籤
+
+    def align(self, lines):
+        """回傳與 lines 等長的串列，能沿用的位置是譯文，需要翻譯的位置是 None"""
+        keys = [match_key(line) for line in lines]
+        known = [self._memory.get(key) for key in keys]
+
+        matcher = difflib.SequenceMatcher(a=self._prev_lines, b=keys, autojunk=False)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag == "equal":
+                for offset in range(j2 - j1):
+                    if self._prev_translations[i1 + offset] is not None:
+                        known[j1 + offset] = self._prev_translations[i1 + offset]
+            elif tag == "replace":
+                # 同一區段內逐行找只差幾個易混淆字元的舊行
+                for j in range(j1, j2):
+                    if known[j] is not None:
+                        continue
+                    best_i, best_edits = None, self.max_edits + 1
+                    for i in range(i1, i2):
+                        edits = glyph_edits(self._prev_lines[i], keys[j])
+                        if edits is not None and edits < best_edits:
+                            best_i, best_edits = i, edits
+                    if best_i is not None:
+                        known[j] = self._prev_translations[best_i]
+        return known
+
+    def scrolled(self, lines):
+        """紀錄或聊天框捲動了：上一次結尾連續至少 min_overlap 行，正好是這次開頭的幾行，後面還有新行
+
+        只有零散的一行相同 (例如對話框每頁都顯示的說話者名字) 不算捲動。
+        """
+        keys = [match_key(line) for line in lines]
+        prev = self._prev_lines
+        for size in range(min(len(prev), len(keys) - 1), self.min_overlap - 1, -1):
+            if all(self._same(old, new) for old, new in zip(prev[-size:], keys[:size])):
+                return True
+        return False
+
+    def _same(self, old, new):
+        edits = glyph_edits(old, new)
+        return edits is not None and edits <= self.max_edits
+
+    def update(self, lines, translations, label=None):
+        """記住這次的行；translations 為 None 時 (整段翻譯) 只記行，之後用來判斷是否捲動"""
+        keys = [match_key(line) for line in lines]
+        self._prev_lines = keys
+        if translations is None:
+            self._prev_translations = [None] * len(keys)
+            return
+        self._prev_translations = list(translations)
+        for key, translation in zip(keys, translations):
+            self._memory[key] = translation
+            self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+        if label:
+            self.label = label
+
+
+def translate_incremental(tracker, text, translate_batch):
+    """逐行增量翻譯：translate_batch(新行清單) 需回傳 (backend, 譯文清單)
+
+    回傳 (後端標籤, 組合後的譯文, 實際送出翻譯的行數)。
+    """
+    lines = split_lines(text)
+    known = tracker.align(lines)
+    new_lines = list(dict.fromkeys(line for line, k in zip(lines, known) if k is None))
+
+    label = tracker.label
+    if new_lines:
+        backend, results = translate_batch(new_lines)
+        label = backend.label
+        translated = dict(zip(new_lines, results))
+        known = [k if k is not None else translated[line] for line, k in zip(lines, known)]
+
+    tracker.update(lines, known, label)
+    return label, "\n".join(known), len(new_lines)
@@ -0,0 +1,151 @@
+# language 負責從 OCR 結果判斷文字系統 (拉丁字母 / 漢字 / 假名 / 諺文)：替每個區域挑最小的 Tesseract 語言組合，並判斷文字是否已經是目標語言。
+import re
+import threading
+
+import config
+
+# 文字已經是目標語言、沒有送去翻譯時，顯示在譯文前的標籤
+SAME_LANGUAGE_LABEL = "原文"
+
+_SCRIPTS = {
+    "latin": re.compile(r"[A-Za-z\u00c0-\u024f]"),
+    "han": re.compile(r"[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]"),
+    "kana": re.compile(r"[\u3040-\u30ff]"),
+    "hangul": re.compile(r"[\u1100-\u11ff\uac00-\ud7af]"),
+}
+
+# 常用字中只出現在簡體 / 只出現在繁體的字 (一一對應)；沒有安裝 opencc 時用來分辨兩者
+_SIMPLIFIED_ONLY = set("这们说时来对会发过还没让国为么书门间问长现点开关车东话认与个见听从样气当经头进动实边觉将")
+_TRADITIONAL_ONLY = set("這們說時來對會發過還沒讓國為麼書門間問長現點開關車東話認與個見聽從樣氣當經頭進動實邊覺將")
+
+_converters = {}
+_converters_lock = threading.Lock()
+
+
+def chinese_converter(conversion):
+    """OpenCC 繁簡轉換器 ("s2t" 簡轉繁 / "t2s" 繁轉簡)，未安裝 opencc 時回傳 None"""
+    with _converters_lock:
+        if conversion not in _converters:
+            try:
+                from opencc import OpenCC
+                _converters[conversion] = OpenCC(conversion)
+            except Exception as e:
+                print(f"[INFO] 無法使用 OpenCC ({conversion})，繁簡判斷改用內建字表: {e}")
+                _converters[conversion] = None
+        return _converters[conversion]
+
+
+def detect_scripts(text, min_share=0.1):
+    """文字中出現的文字系統；佔所有字母類字元 min_share 以上才算 (忽略 OCR 雜訊與夾雜的少量英文)"""
+    counts = {name: len(pattern.findall(text)) for name, pattern in _SCRIPTS.items()}
+    total = sum(counts.values())
+    if not total:
+        return set()
+    return {name for name, count in counts.items() if count / total >= min_share}
+
+
+def text_language(text):
+    """粗略判斷文字的語言：hant 繁體中文 / hans 簡體中文 / han 看不出繁簡的漢字 / latin / ja / ko；混合或無法判斷時回傳 None"""
+    scripts = detect_scripts(text)
+    if "kana" in scripts:
+        return "ja"
+    if "hangul" in scripts:
+        return "ko"
+    if scripts == {"latin"}:
+        return "latin"
+    if scripts == {"han"}:
+        return _chinese_variant(text)
+    return None
+
+
+def _chinese_variant(text):
+    to_traditional, to_simplified = chinese_converter("s2t"), chinese_converter("t2s")
+    if to_traditional is not None and to_simplified is not None:
+        # 轉成繁體會改變的字是簡體字，轉成簡體會改變的字是繁體字
+        simplified = sum(a != b for a, b in zip(text, to_traditional.convert(text)))
+        traditional = sum(a != b for a, b in zip(text, to_simplified.convert(text)))
+    else:
+        simplified = sum(ch in _SIMPLIFIED_ONLY for ch in text)
+        traditional = sum(ch in _TRADITIONAL_ONLY for ch in text)
+    if simplified > traditional:
+        return "hans"
+    if traditional > simplified:
+        return "hant"
+    return "han"
+
+
+def is_target_language(text):
+    """文字是否確定已經是目標語言 (config.TARGET_SCRIPT)，是的話不必翻譯
+
+    只在明確判斷出目標的繁 / 簡寫法時略過：看不出繁簡的漢字 (han) 可能是字表沒涵蓋的簡體，
+    拉丁字母也分不出英文、法文或德文，這兩種都照常翻譯。
+    """
+    if not config.SKIP_SAME_LANGUAGE or not text:
+        return False
+    if config.TARGET_SCRIPT not in ("hant", "hans"):
+        return False
+    return text_language(text) == config.TARGET_SCRIPT
+
+
+class RegionLanguages:
+    """記住每個區域上次辨識出的文字系統，之後只用對應的最小 Tesseract 語言組合 (單一語言模型快很多)
+
+    第一次 (以及每 reprobe_every 次) 用完整的語言組合辨識並重新判斷；
+    縮小後信心過低、或結果出現其他文字系統時，由呼叫端改用完整語言重跑。
+    """
+
+    def __init__(self, full_lang, script_langs, min_confidence=60, reprobe_every=30):
+        self.full_lang = full_lang
+        self._available = full_lang.split("+")
+        self.script_langs = script_langs
+        self.min_confidence = min_confidence
+        self.reprobe_every = reprobe_every
+        self._regions = {}  # 區域名稱 -> [語言組合, 之後已使用幾次]
+        self._lock = threading.Lock()
+
+    def smallest_lang(self, scripts):
+        """涵蓋這些文字系統的最小語言組合 (依 OCR_LANG 中的順序)；無法涵蓋時回傳完整組合"""
+        langs = set()
+        for script in scripts:
+            lang = self.script_langs.get(script)
+            if lang is None:
+                return self.full_lang
+            langs.update(lang.split("+"))
+        if not langs or not langs <= set(self._available):
+            return self.full_lang
+        return "+".join(lang for lang in self._available if lang in langs)
+
+    def candidate_langs(self):
+        """可能被選用的縮小語言組合 (暖機時先載入)"""
+        langs = {self.smallest_lang({script}) for script in self.script_langs}
+        return sorted(langs - {self.full_lang})
+
+    def lang_for(self, region):
+        with self._lock:
+            entry = self._regions.get(region)
+            if entry is None or entry[1] >= self.reprobe_every:
+                return self.full_lang
+            entry[1] += 1
+            return entry[0]
+
+    def needs_fallback(self, lang, text, confidence):
+        """用縮小的語言組合辨識後，是否該改用完整組合重跑"""
+        if lang == self.full_lang or not text:
+            return False
+        if confidence is not None and confidence < self.min_confidence:
+            return True
+        # 結果出現這個組合以外的文字系統 (例如遊戲換了語言)
+        scripts = detect_scripts(text)
+        return bool(scripts) and self.smallest_lang(scripts) != lang
+
+    def learn(self, region, text):
+        """依完整語言組合辨識出的文字，決定此區域之後使用的語言組合 (沒有文字時維持原狀)"""
+        scripts = detect_scripts(text)
+        if not scripts:
+            return
+        lang = self.smallest_lang(scripts)
+        with self._lock:
+            if lang == self.full_lang:
+                self._regions.pop(region, None)
+            else:
+                self._regions[region] = [lang, 0]
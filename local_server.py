@@ -0,0 +1,191 @@
+# local_server 在本機 (127.0.0.1) 提供 HTTP JSON 服務，讓實況疊圖、聊天機器人、QA 腳本等其他程式共用這個程式已暖機的 OCR 引擎、快取與批次翻譯。
+# 端點:
+#   GET  /health                 後端健康狀態、翻譯快取與翻譯記憶的統計
+#   POST /translate              {"text": "..."} 或 {"texts": ["...", ...]}
+#   POST /ocr[?translate=0]      內容直接放圖片檔 (PNG / JPG...)，回傳辨識出的文字與譯文
+# 範例:
+#   curl -s localhost:8765/translate -d '{"text": "Hello there"}'
+#   curl -s localhost:8765/ocr --data-binary @shot.png
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import config
+
+
+class RequestError(Exception):
+    """回給用戶端的錯誤 (HTTP 狀態碼 + 訊息)"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "OverlayTranslator"
+
+    def do_GET(self):
+        self._dispatch({"/health": self.server.service.health})
+
+    def do_POST(self):
+        self._dispatch({"/translate": self.server.service.translate, "/ocr": self.server.service.ocr})
+
+    def _dispatch(self, routes):
+        url = urlparse(self.path)
+        handler = routes.get(url.path)
+        try:
+            if handler is None:
+                raise RequestError(404, f"未知的端點：{url.path}")
+            status, body = handler(self, parse_qs(url.query))
+        except RequestError as e:
+            status, body = e.status, {"error": str(e)}
+        except Exception as e:
+            status, body = 500, {"error": str(e)}
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length <= 0:
+            raise RequestError(400, "請求內容是空的")
+        if length > config.LOCAL_SERVER_MAX_BYTES:
+            raise RequestError(413, f"請求內容超過 {config.LOCAL_SERVER_MAX_BYTES} bytes")
+        return self.rfile.read(length)
+
+    def read_json(self):
+        try:
+            return json.loads(self.read_body().decode("utf-8"))
+        except ValueError:
+            raise RequestError(400, "請求內容不是有效的 JSON")
+
+    def log_message(self, format, *args):
+        print(f"[DEBUG] [本機服務] {self.address_string()} {format % args}")
+
+
+class LocalTranslationServer:
+    """把請求交給 GUI 已經暖機好的 OCRTranslateWorker：共用 OCR 引擎、畫面快取、翻譯快取、翻譯記憶與批次器
+
+    get_worker() 回傳目前的 worker (背景載入完成前為 None)。
+    同時送來的翻譯請求經過 worker 的批次器，會被合併成一次後端呼叫。
+    """
+
+    def __init__(self, get_worker, host="127.0.0.1", port=8765):
+        self.get_worker = get_worker
+        self.httpd = ThreadingHTTPServer((host, port), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.service = self
+        # texts 陣列的每一段平行送進批次器，才能和其他請求湊成同一批
+        self._executor = ThreadPoolExecutor(max_workers=config.BATCH_MAX_SEGMENTS, thread_name_prefix="local-server")
+        self._thread = None
+
+    @property
+    def address(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="local-server", daemon=True)
+        self._thread.start()
+        print(f"[INFO] 本機服務已啟動：{self.address}")
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self._executor.shutdown(wait=False)
+
+    def _ready_worker(self):
+        # 程式剛啟動時 worker 還在背景載入或暖機，請求先等一下而不是直接失敗
+        deadline = time.monotonic() + config.LOCAL_SERVER_WARMUP_TIMEOUT
+        while True:
+            worker = self.get_worker()
+            if worker is not None and worker.warmed.wait(timeout=0.1):
+                return worker
+            if worker is None:
+                time.sleep(0.1)
+            if time.monotonic() >= deadline:
+                raise RequestError(503, "OCR 與翻譯引擎仍在載入中，請稍後再試")
+
+    def _translate_record(self, worker, text):
+        from backends import TranslationError
+
+        record = {"text": text, "translation": None, "backend": None, "error": None}
+        if not text.strip():
+            return record
+        try:
+            record["backend"], record["translation"] = worker.translate_request(text)
+        except TranslationError as e:
+            record["error"] = str(e)
+        return record
+
+    # --- 端點 ---
+    def health(self, handler, query):
+        from cache import get_translation_cache
+
+        worker = self.get_worker()
+        ready = worker is not None and worker.warmed.is_set()
+        body = {"ready": ready}
+        if ready:
+            body["backends"] = worker.translator.health_report()
+            if worker.memory is not None:
+                body["memory"] = worker.memory.stats()
+        cache = get_translation_cache()
+        if cache:
+            body["cache"] = cache.stats()
+        return 200, body
+
+    def translate(self, handler, query):
+        payload = handler.read_json()
+        if not isinstance(payload, dict):
+            raise RequestError(400, "請求內容必須是 JSON 物件")
+        started = time.perf_counter()
+        worker = self._ready_worker()
+
+        if "texts" in payload:
+            texts = payload["texts"]
+            if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+                raise RequestError(400, "texts 必須是字串陣列")
+            records = list(self._executor.map(lambda t: self._translate_record(worker, t), texts))
+            return 200, {"results": records, "ms": round((time.perf_counter() - started) * 1000, 1)}
+
+        text = payload.get("text")
+        if not isinstance(text, str):
+            raise RequestError(400, "需要 text (字串) 或 texts (字串陣列)")
+        record = self._translate_record(worker, text)
+        record["ms"] = round((time.perf_counter() - started) * 1000, 1)
+        return (502 if record["error"] else 200), record
+
+    def ocr(self, handler, query):
+        from pipeline import decode_image
+
+        gray = decode_image(handler.read_body())
+        if gray is None:
+            raise RequestError(400, "無法解碼圖片 (請直接傳送 PNG / JPG 檔案內容)")
+        started = time.perf_counter()
+        worker = self._ready_worker()
+
+        text = worker.recognize_request(gray)
+        ocr_ms = round((time.perf_counter() - started) * 1000, 1)
+        if query.get("translate", ["1"])[0] in ("0", "false", "no"):
+            record = {"text": text, "translation": None, "backend": None, "error": None}
+        else:
+            record = self._translate_record(worker, text)
+        record.update({"ocr_ms": ocr_ms, "ms": round((time.perf_counter() - started) * 1000, 1)})
+        return 200, record
+
+
+def start_local_server(get_worker):
+    """依設定啟動本機服務；埠號被占用等錯誤只印出警告，不影響主程式"""
+    try:
+        server = LocalTranslationServer(get_worker, config.LOCAL_SERVER_HOST, config.LOCAL_SERVER_PORT)
+    except OSError as e:
+        print(f"[WARN] 本機服務無法啟動 ({config.LOCAL_SERVER_HOST}:{config.LOCAL_SERVER_PORT}): {e}")
+        return None
+    server.start()
+    return server
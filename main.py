@@ -1,4 +1,5 @@
 # main 負責組合所有模組並啟動應用程式。
+from startup import get_startup_report  # 最先 import，記錄程式啟動的時間點
 import ctypes
 try:
     # 告訴 Windows：我自己會處理 DPI，不要幫我縮放
@@ -12,13 +13,18 @@ from PySide6.QtWidgets import QApplication
 from PySide6.QtCore import QMetaObject, Qt
 import keyboard
 from functools import partial
+import config
 from gui.result_window import ResultWindow
 
 def hotkey_callback(window_ref):
     # 跨執行緒呼叫
     QMetaObject.invokeMethod(window_ref, "trigger_translation", Qt.QueuedConnection)
 
+def watch_hotkey_callback(window_ref):
+    QMetaObject.invokeMethod(window_ref, "toggle_watch_mode", Qt.QueuedConnection)
+
 def main():
+    get_startup_report().milestone("模組載入完成")
     app = QApplication(sys.argv)
     
     result_window = ResultWindow()
@@ -27,10 +33,18 @@ def main():
     try:
         cb = partial(hotkey_callback, result_window)
         keyboard.add_hotkey("F9", cb)
-        print("服務啟動。按 F9 翻譯。")
+        keyboard.add_hotkey("F10", partial(watch_hotkey_callback, result_window))
+        print("服務啟動。按 F9 翻譯，F10 切換監看模式。")
     except Exception as e:
         print(f"熱鍵註冊失敗: {e}")
 
+    # 本機服務：其他程式共用這裡已暖機的 OCR 引擎、快取與批次翻譯
+    if config.LOCAL_SERVER_ENABLED:
+        from local_server import start_local_server
+        server = start_local_server(lambda: result_window.worker)
+        if server:
+            app.aboutToQuit.connect(server.stop)
+
     sys.exit(app.exec())
 
 if __name__ == "__main__":
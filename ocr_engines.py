@@ -0,0 +1,191 @@
+# ocr_engines 負責封裝各種 OCR 引擎，常駐引擎只初始化一次並在多次工作間重複使用。
+import threading
+
+import cv2
+import pytesseract
+
+import config
+from frame_buffers import FrameRing
+from text_detect import detect_text_lines, glyph_scale
+
+# 設定 Tesseract 路徑 (請確認路徑正確)
+pytesseract.pytesseract.tesseract_cmd = config.TESSERACT_CMD
+
+
+class TesseractCLIEngine:
+    """pytesseract：每次呼叫都會啟動 tesseract.exe 子程序 (最慢，但不需額外套件)"""
+    name = "pytesseract"
+    needs_binary = True  # 需要先經過放大與二值化
+    selectable_lang = True  # 每次辨識可以指定不同的 Tesseract 語言組合
+
+    def __init__(self, lang, psm):
+        self.lang = lang
+        self.psm = psm
+        self.last_confidence = None  # 子程序模式不回報信心值
+
+    def recognize(self, image, single_line=False, lang=None):
+        psm = 7 if single_line else self.psm
+        return pytesseract.image_to_string(image, lang=lang or self.lang, config=f'--psm {psm}').strip()
+
+    def close(self):
+        pass
+
+
+class TesserocrEngine:
+    """tesserocr：在行程內保留一個 Tesseract API handle，traineddata 只載入一次"""
+    name = "tesserocr"
+    needs_binary = True
+    selectable_lang = True
+
+    def __init__(self, lang, psm):
+        from tesserocr import PyTessBaseAPI
+
+        self._api_cls = PyTessBaseAPI
+        self.lang = lang
+        self.psm = psm
+        self._apis = {}  # 語言組合 -> 常駐的 API handle (切換語言要重新 Init，所以每種組合各留一個)
+        self.api = self._api(lang)
+        self.last_confidence = None  # 上一次辨識的平均信心值 (0~100)
+
+    def _api(self, lang):
+        api = self._apis.get(lang)
+        if api is None:
+            api = self._apis[lang] = self._api_cls(path=config.TESSDATA_PATH, lang=lang, psm=self.psm)
+        return api
+
+    def recognize(self, image, single_line=False, lang=None):
+        api = self._api(lang or self.lang)
+        height, width = image.shape[:2]
+        # 單行裁切用 PSM 7 (SINGLE_LINE)，整塊區域用設定的 psm
+        api.SetPageSegMode(7 if single_line else self.psm)
+        # 8-bit 灰階 / 二值圖：每像素 1 byte
+        api.SetImageBytes(image.tobytes(), width, height, 1, width)
+        text = api.GetUTF8Text().strip()
+        self.last_confidence = api.MeanTextConf()
+        return text
+
+    def close(self):
+        for api in self._apis.values():
+            api.End()
+
+
+class PaddleEngine:
+    """PaddleOCR：模型載入一次後常駐 (與 translate.py 的做法相同)"""
+    name = "paddle"
+    needs_binary = False  # PaddleOCR 自帶偵測，直接吃原始灰階效果較好
+    selectable_lang = False  # 語言由 PADDLE_LANG 的模型決定
+    last_confidence = None
+
+    def __init__(self, lang, psm):
+        from paddleocr import PaddleOCR
+
+        self.engine = PaddleOCR(
+            lang=config.PADDLE_LANG,
+            use_doc_orientation_classify=False,
+            use_doc_unwarping=False,
+            use_textline_orientation=False,
+        )
+
+    def recognize(self, image, single_line=False, lang=None):
+        if image.ndim == 2:
+            image = cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+        result = self.engine.predict(image)
+        if not result:
+            return ""
+        return "\n".join(result[0]["rec_texts"]).strip()
+
+    def close(self):
+        pass
+
+
+# 前處理的放大圖與二值圖緩衝區，每條執行緒各一組 (各執行緒有自己的 OCR 引擎，一次只處理一張圖)
+_buffers = threading.local()
+
+
+def _thread_buffers():
+    buffers = getattr(_buffers, "ring", None)
+    if buffers is None:
+        buffers = _buffers.ring = FrameRing(slots=1)
+    return buffers
+
+
+def preprocess(gray, scale=2.0, buffers=None, key=0):
+    """OCR 前處理：放大 (INTER_CUBIC) + Otsu 二值化
+
+    buffers (FrameRing) 有給時結果寫進 key 對應的緩衝區，尺寸不變就不再配置記憶體；
+    回傳的圖在下一次以同一個 key 前處理之前有效。
+    """
+    if scale == 1.0:
+        scaled = gray
+    else:
+        # 與 OpenCV 依 fx / fy 推算的輸出尺寸相同 (cvRound)，dst 尺寸吻合時 resize 直接寫入不再配置
+        shape = (int(round(gray.shape[0] * scale)), int(round(gray.shape[1] * scale)))
+        dst = buffers.acquire(("scaled", key), shape) if buffers is not None else None
+        scaled = cv2.resize(gray, None, dst=dst, fx=scale, fy=scale, interpolation=cv2.INTER_CUBIC)
+    dst = buffers.acquire(("binary", key), scaled.shape) if buffers is not None else None
+    _, binary = cv2.threshold(scaled, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU, dst=dst)
+    return binary
+
+
+def prepare_ocr_images(engine, gray, boxes=None):
+    """產生要送進 OCR 的圖片清單 [(image, single_line), ...]
+
+    有偵測到文字行時只裁切那幾行，並依行高調整放大倍率；否則沿用整張 2 倍放大。
+    產生的圖放在目前執行緒的共用緩衝區，要在同一執行緒下一次呼叫前用完。
+    """
+    if not engine.needs_binary:
+        return [(gray, False)]
+    buffers = _thread_buffers()
+    if not boxes:
+        return [(preprocess(gray, buffers=buffers), False)]
+
+    images = []
+    for index, (x, y, w, h) in enumerate(boxes):
+        crop = gray[y:y + h, x:x + w]
+        scale = glyph_scale(h, config.TARGET_GLYPH_HEIGHT)
+        images.append((preprocess(crop, scale, buffers, key=index), True))
+    return images
+
+
+def find_text_boxes(engine, gray):
+    """引擎需要二值圖且啟用文字偵測時回傳文字行位置，否則回傳 None (整張辨識)"""
+    if not (config.TEXT_DETECTION and engine.needs_binary):
+        return None
+    return detect_text_lines(gray) or None
+
+
+def run_ocr(engine, gray):
+    """文字偵測 -> 前處理 -> 辨識，多行結果以換行串接"""
+    boxes = find_text_boxes(engine, gray)
+    texts = [engine.recognize(image, single_line=single_line)
+             for image, single_line in prepare_ocr_images(engine, gray, boxes)]
+    return "\n".join(t for t in texts if t).strip()
+
+
+OCR_ENGINES = {
+    TesseractCLIEngine.name: TesseractCLIEngine,
+    TesserocrEngine.name: TesserocrEngine,
+    PaddleEngine.name: PaddleEngine,
+}
+
+
+def create_ocr_engine(name=None, lang=None, psm=None):
+    """依名稱建立 OCR 引擎；套件未安裝或初始化失敗時回退到 pytesseract"""
+    name = name or config.OCR_ENGINE
+    lang = lang or config.OCR_LANG
+    psm = psm or config.OCR_PSM
+
+    engine_cls = OCR_ENGINES.get(name)
+    if engine_cls is None:
+        print(f"[WARN] 未知的 OCR 引擎 '{name}'，改用 pytesseract。")
+        engine_cls = TesseractCLIEngine
+
+    if engine_cls is not TesseractCLIEngine:
+        try:
+            engine = engine_cls(lang, psm)
+            print(f"[INFO] OCR 引擎: {engine.name}")
+            return engine
+        except Exception as e:
+            print(f"[WARN] OCR 引擎 {name} 初始化失敗 ({e})，改用 pytesseract。")
+
+    return TesseractCLIEngine(lang, psm)
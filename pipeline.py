@@ -0,0 +1,193 @@
+# pipeline 負責與截圖來源無關的處理階段 (指紋 -> 文字偵測 -> 前處理 -> OCR -> 去重批次翻譯)，供即時 worker、批次與影片模式共用。
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import cv2
+import numpy as np
+
+import config
+from cache import normalize_text
+from frame_hash import frame_fingerprint
+from language import SAME_LANGUAGE_LABEL, is_target_language
+from ocr_engines import find_text_boxes, prepare_ocr_images
+from tracing import optional_span
+
+
+def decode_image(data):
+    """圖片檔內容 (PNG / JPG... 的 bytes 或 uint8 陣列) -> 灰階圖，無法解碼時回傳 None"""
+    data = np.frombuffer(data, dtype=np.uint8) if isinstance(data, (bytes, bytearray)) else data
+    if data.size == 0:
+        return None
+    return cv2.imdecode(data, cv2.IMREAD_GRAYSCALE)
+
+
+def read_image(path):
+    """以灰階讀取圖片 (用 imdecode 讀檔，Windows 上含中文的路徑也能讀)，讀不到時回傳 None"""
+    return decode_image(np.fromfile(path, dtype=np.uint8))
+
+
+def _recognize_images(engine, images, lang):
+    """逐張辨識，回傳 (串接後的文字, 平均信心值)；引擎不回報信心值時為 None"""
+    texts, confidences = [], []
+    for image, single_line in images:
+        text = engine.recognize(image, single_line=single_line, lang=lang)
+        texts.append(text)
+        if text and engine.last_confidence is not None:
+            confidences.append(engine.last_confidence)
+    confidence = sum(confidences) / len(confidences) if confidences else None
+    return "\n".join(t for t in texts if t).strip(), confidence
+
+
+def recognize_frame(engine, gray, frame_cache=None, tracer=None, job_id=None, region=None, check=None,
+                    languages=None):
+    """單張灰階圖的 指紋 -> 文字偵測 -> 前處理 -> OCR，回傳辨識出的文字
+
+    frame_cache 有給時，畫面跟之前的一樣就直接沿用 OCR 結果；
+    check 會在每個階段之間被呼叫 (例如檢查工作是否已被取代，要中止就拋出例外)；
+    languages (RegionLanguages) 有給時，依 region 上次辨識出的文字系統只用最小的 Tesseract 語言組合。
+    """
+    check = check or (lambda: None)
+
+    fingerprint = None
+    if frame_cache is not None:
+        with optional_span(tracer, job_id, "fingerprint", region=region) as span:
+            fingerprint = frame_fingerprint(gray, config.FRAME_HASH_SIZE)
+            text = frame_cache.lookup(fingerprint, gray)
+            span["hit"] = text is not None
+        if text is not None:
+            print(f"[DEBUG] [{region}] 畫面未變化，略過 OCR")
+            return text
+
+    check()
+    with optional_span(tracer, job_id, "detect", region=region) as span:
+        boxes = find_text_boxes(engine, gray)
+        span["lines"] = len(boxes) if boxes else 0
+    check()
+    with optional_span(tracer, job_id, "preprocess", region=region) as span:
+        images = prepare_ocr_images(engine, gray, boxes)
+        span["pixels"] = sum(image.size for image, _ in images)
+    check()
+    if not engine.selectable_lang:
+        languages = None
+    lang = languages.lang_for(region) if languages is not None else None
+    with optional_span(tracer, job_id, "ocr", region=region, engine=engine.name, lang=lang):
+        text, confidence = _recognize_images(engine, images, lang)
+
+    if languages is not None:
+        if languages.needs_fallback(lang, text, confidence):
+            # 縮小的語言組合認不好 (信心低或畫面換了語言)，用完整組合重跑並重新判斷
+            print(f"[DEBUG] [{region}] 以 {lang} 辨識結果不可靠，改用 {languages.full_lang} 重新辨識")
+            check()
+            lang = languages.full_lang
+            with optional_span(tracer, job_id, "ocr", region=region, engine=engine.name, lang=lang, fallback=True):
+                text, confidence = _recognize_images(engine, images, lang)
+        if lang == languages.full_lang:
+            languages.learn(region, text)
+
+    if frame_cache is not None:
+        frame_cache.store(fingerprint, gray, text)
+    return text
+
+
+def chunk_texts(texts, max_segments, max_chars):
+    """依段數與字數上限把文字切成多批 (單段超過字數上限時自成一批)"""
+    batch, chars = [], 0
+    for text in texts:
+        if batch and (len(batch) >= max_segments or chars + len(text) > max_chars):
+            yield batch
+            batch, chars = [], 0
+        batch.append(text)
+        chars += len(text)
+    if batch:
+        yield batch
+
+
+class BatchTranslator:
+    """相同的文字 (正規化後) 只翻譯一次；不同的文字湊成批次送出，翻好就把等待中的紀錄寫出
+
+    紀錄是含有 "text" 與 "error" 的 dict，寫出前會補上 "translation" 與 "backend"。
+    """
+
+    FLUSH_SEC = 1.0  # 等待湊批的文字最多放多久就送出，讓結果持續串流輸出
+
+    def __init__(self, chain, write, max_segments, max_chars, threads=2):
+        self.chain = chain
+        self.write = write
+        self.max_segments = max_segments
+        self.max_chars = max_chars
+        self._executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="batch-translate")
+        self._done = {}       # 正規化文字 -> (後端標籤, 譯文, 錯誤)
+        self._waiting = {}    # 正規化文字 -> [等待譯文的紀錄, ...]
+        self._buffer = []     # 尚未送出的文字
+        self._buffer_since = None
+        self._inflight = set()
+        self.segments_sent = 0
+
+    def add(self, record):
+        if is_target_language(record["text"]):
+            # 已經是目標語言，不送去翻譯
+            self._emit(record, (SAME_LANGUAGE_LABEL, record["text"], None))
+            self._poll()
+            return
+        key = normalize_text(record["text"])
+        if key in self._done:
+            self._emit(record, self._done[key])
+        else:
+            self._waiting.setdefault(key, []).append(record)
+            if len(self._waiting[key]) == 1:
+                self._buffer.append(record["text"])
+                self._buffer_since = self._buffer_since or time.monotonic()
+        self._poll()
+
+    def _poll(self, flush=False):
+        chars = sum(len(text) for text in self._buffer)
+        stale = self._buffer_since is not None and time.monotonic() - self._buffer_since >= self.FLUSH_SEC
+        if self._buffer and (flush or stale or len(self._buffer) >= self.max_segments or chars >= self.max_chars):
+            for batch in chunk_texts(self._buffer, self.max_segments, self.max_chars):
+                self._inflight.add(self._executor.submit(self._translate, batch))
+                self.segments_sent += len(batch)
+            self._buffer, self._buffer_since = [], None
+        self._collect(block=False)
+
+    def _translate(self, batch):
+        try:
+            backend, results = self.chain.translate_batch(batch)
+            return batch, [(backend.label, result, None) for result in results]
+        except Exception as e:
+            return batch, [(None, None, str(e))] * len(batch)
+
+    def _collect(self, block):
+        if not self._inflight:
+            return
+        done, _ = wait(self._inflight, timeout=None if block else 0, return_when=FIRST_COMPLETED)
+        for future in done:
+            self._inflight.discard(future)
+            batch, results = future.result()
+            for text, result in zip(batch, results):
+                key = normalize_text(text)
+                self._done[key] = result
+                for record in self._waiting.pop(key, []):
+                    self._emit(record, result)
+
+    def _emit(self, record, result):
+        label, translation, error = result
+        record.update({"translation": translation, "backend": label})
+        if error and not record["error"]:
+            record["error"] = error
+        self.write(record)
+
+    def finish(self):
+        self._poll(flush=True)
+        while self._inflight:
+            self._collect(block=True)
+        self._executor.shutdown()
+
+
+def create_translation_chain():
+    """不經過 GUI 的模式 (批次、影片) 用：依設定建立 Gemini Client 與翻譯後端串列"""
+    from backends import build_backend_chain, create_gemini_client
+
+    client = None
+    if config.GOOGLE_API_KEY:
+        client = create_gemini_client(config.GOOGLE_API_KEY)
+    return build_backend_chain(client)
@@ -0,0 +1,67 @@
+# startup 負責記錄啟動各階段 (import、建立視窗、背景暖機) 的耗時，並輸出啟動報告。
+import importlib
+import threading
+import time
+from contextlib import contextmanager
+
+# main.py 最先 import 本模組，以此當作程式啟動的時間點
+PROCESS_START = time.perf_counter()
+
+# 不影響視窗顯示、可以等視窗出現後才在背景載入的重量級模組 (依序載入以便分別計時)
+HEAVY_MODULES = ["numpy", "cv2", "mss", "pytesseract", "google.genai", "requests", "workers"]
+
+
+class StartupReport:
+    """階段 (phase) 記錄耗時，里程碑 (milestone) 記錄距離程式啟動的時間"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.phases = []      # [(名稱, 秒數), ...]
+        self.milestones = []  # [(名稱, 距離啟動的秒數), ...]
+
+    @contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.phases.append((name, time.perf_counter() - started))
+
+    def milestone(self, name):
+        with self._lock:
+            self.milestones.append((name, time.perf_counter() - PROCESS_START))
+
+    def elapsed(self, name):
+        """某個里程碑距離程式啟動的秒數 (尚未到達時回傳 None)"""
+        with self._lock:
+            for milestone, seconds in self.milestones:
+                if milestone == name:
+                    return seconds
+        return None
+
+    def format(self):
+        with self._lock:
+            phases = list(self.phases)
+            milestones = list(self.milestones)
+        lines = ["===== 啟動報告 ====="]
+        lines += [f"  {name:<28} {seconds * 1000:>8.1f} ms" for name, seconds in phases]
+        lines += [f"  [{name}] 啟動後 {seconds:.2f}s" for name, seconds in milestones]
+        return "\n".join(lines)
+
+
+_report = StartupReport()
+
+
+def get_startup_report():
+    return _report
+
+
+def preload_modules(names=HEAVY_MODULES):
+    """逐一 import 重量級模組並記錄各自的耗時 (在背景執行緒呼叫)"""
+    for name in names:
+        with _report.phase(f"import {name}"):
+            try:
+                importlib.import_module(name)
+            except ImportError as e:
+                print(f"[WARN] 預先載入 {name} 失敗: {e}")
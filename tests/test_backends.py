@@ -0,0 +1,84 @@
+import os
+import sys
+from contextlib import nullcontext
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import backends  # noqa: E402
+from backends import BackendChain  # noqa: E402
+from cache import TranslationCache  # noqa: E402
+
+
+class FakeBackend:
+    name = "gemini"
+    label = "Gemini"
+
+    def __init__(self):
+        self.calls = 0
+
+    def translate(self, text, on_partial=None):
+        self.calls += 1
+        return f"<{text}>"
+
+    def translate_batch(self, texts):
+        return [self.translate(text) for text in texts]
+
+
+def _half_open_chain(tmp_path):
+    backend = FakeBackend()
+    cache = TranslationCache(str(tmp_path / "cache.db"))
+    chain = BackendChain([backend], policy="sequential", cache=cache,
+                         health_options={"failure_threshold": 1, "cooldown": 0.0})
+    health = chain.health[backend.name]
+    health.record(1.0, ok=False)  # 斷路器開啟，冷卻 0 秒後立刻變成 half_open
+    assert health.snapshot()["state"] == "half_open"
+    return chain, backend, cache, health
+
+
+def test_half_open_probe_answered_from_cache_releases_slot(tmp_path):
+    chain, backend, cache, health = _half_open_chain(tmp_path)
+    cache.put("hello", backend.name, "<hello>")
+
+    assert chain.translate("hello")[1] == "<hello>"
+    assert backend.calls == 0
+    # 試探名額已還回去，下一次仍會呼叫這個後端
+    assert health.available()
+    assert chain.translate("world")[1] == "<world>"
+    assert backend.calls == 1
+    assert health.snapshot()["state"] == "closed"
+    cache.close()
+
+
+def test_half_open_batch_probe_answered_from_cache_releases_slot(tmp_path):
+    chain, backend, cache, health = _half_open_chain(tmp_path)
+    cache.put("a", backend.name, "<a>")
+    cache.put("b", backend.name, "<b>")
+
+    assert chain.translate_batch(["a", "b"])[1] == ["<a>", "<b>"]
+    assert backend.calls == 0
+    assert health.available()
+    cache.close()
+
+
+class SpanLog:
+    def __init__(self):
+        self.names = []
+
+    def span(self, job_id, name, **attrs):
+        self.names.append(name)
+        return nullcontext(attrs)
+
+
+def test_spans_go_only_to_the_given_tracer(tmp_path, monkeypatch):
+    # 沒給 tracer 的 chain (benchmark) 不能寫進全域 trace
+    monkeypatch.setattr(backends, "get_tracer", lambda: pytest.fail("global tracer used"))
+    cache = TranslationCache(str(tmp_path / "cache.db"))
+    assert BackendChain([FakeBackend()], policy="sequential", cache=cache).translate("hi")[1] == "<hi>"
+
+    log = SpanLog()
+    chain = BackendChain([FakeBackend()], policy="sequential", cache=cache, tracer=log)
+    chain.translate("hello", job_id=1)
+    assert sorted(log.names) == ["route", "translate"]
+    cache.close()
@@ -0,0 +1,35 @@
+import os
+import sqlite3
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config  # noqa: E402
+from cache import TranslationCache  # noqa: E402
+
+
+def test_recent_entries_only_returns_current_target_language(tmp_path, monkeypatch):
+    cache = TranslationCache(str(tmp_path / "cache.db"))
+    monkeypatch.setattr(config, "TARGET_LANG", "Japanese")
+    cache.put("Hello", "gemini", "こんにちは")
+    monkeypatch.setattr(config, "TARGET_LANG", "Traditional Chinese (繁體中文)")
+    cache.put("Goodbye", "gemini", "再見")
+
+    assert cache.recent_entries(10) == [("Goodbye", "gemini", "再見")]
+    cache.close()
+
+
+def test_old_database_is_migrated_and_old_rows_are_not_seeded(tmp_path):
+    path = str(tmp_path / "cache.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE translations (key TEXT PRIMARY KEY, backend TEXT NOT NULL, source TEXT NOT NULL,"
+                 " translation TEXT NOT NULL, created REAL NOT NULL, last_used REAL NOT NULL)")
+    conn.execute("INSERT INTO translations VALUES ('k', 'gemini', 'Hello', '你好', 9e12, 9e12)")
+    conn.commit()
+    conn.close()
+
+    cache = TranslationCache(path)
+    assert cache.recent_entries(10) == []
+    cache.put("Hi", "gemini", "嗨")
+    assert cache.recent_entries(10) == [("Hi", "gemini", "嗨")]
+    cache.close()
@@ -0,0 +1,21 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from incremental import LineTracker  # noqa: E402
+
+
+def test_repeated_speaker_name_is_not_a_scroll():
+    tracker = LineTracker()
+    tracker.update(["Alice", "I think the gate will not", "open without the key."], None)
+    assert not tracker.scrolled(["Alice", "We should go back to the", "village before nightfall."])
+
+
+def test_old_suffix_matching_new_prefix_is_a_scroll():
+    tracker = LineTracker()
+    tracker.update(["[Bob] hi", "[Eve] hello there", "[Bob] ready?"], None)
+    assert tracker.scrolled(["[Eve] hello there", "[Bob] ready?", "[Eve] let's go"])
+    # 只重疊一行、或完全沒有新行都不算捲動
+    assert not tracker.scrolled(["[Bob] ready?", "[Eve] let's go", "[Bob] ok"])
+    assert not tracker.scrolled(["[Bob] hi", "[Eve] hello there", "[Bob] ready?"])
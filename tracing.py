@@ -0,0 +1,139 @@
+# tracing 負責記錄管線各階段耗時 (span)，寫入輪替的 JSONL 檔，並提供給介面顯示的即時摘要。
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from logging.handlers import RotatingFileHandler
+
+import config
+
+
+class Tracer:
+    """每個 span 一行 JSON：job_id、階段名稱、開始時間、耗時與額外欄位"""
+
+    def __init__(self, path=None, max_bytes=5 * 1024 * 1024, backup_count=3, window=100):
+        self._logger = logging.getLogger("pipeline.trace")
+        self._logger.setLevel(logging.INFO)
+        self._logger.propagate = False
+        if path and not self._logger.handlers:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            self._logger.addHandler(handler)
+
+        self._lock = threading.Lock()
+        self._jobs = {}  # job_id -> {"start": perf_counter, "emitted": perf_counter}
+        self._totals = deque(maxlen=window)  # 最近幾次工作的總延遲 (秒)
+        self.last_total = None
+
+    def _write(self, record):
+        if self._logger.handlers:
+            self._logger.info(json.dumps(record, ensure_ascii=False))
+
+    @contextmanager
+    def span(self, job_id, name, **attrs):
+        """量測一個階段；yield 出的 dict 可在階段內補充欄位 (例如後端名稱、是否命中快取)"""
+        start_wall = time.time()
+        started = time.perf_counter()
+        status = "ok"
+        try:
+            yield attrs
+        except Exception:
+            status = "error"
+            raise
+        finally:
+            self.record(job_id, name, start_wall, time.perf_counter() - started, status, **attrs)
+
+    def record(self, job_id, name, start, duration, status="ok", **attrs):
+        """寫入在別處量好的 span (例如介面執行緒在送出工作前做的座標換算)；start 為 time.time()，duration 為秒"""
+        self._write({
+            "job_id": job_id,
+            "span": name,
+            "start": start,
+            "duration_ms": round(duration * 1000, 3),
+            "status": status,
+            **attrs,
+        })
+
+    def begin_job(self, job_id):
+        with self._lock:
+            self._jobs[job_id] = {"start": time.perf_counter(), "start_wall": time.time(), "emitted": None}
+
+    def job_emitted(self, job_id):
+        # worker 送出訊號的時間點，用來計算送到介面所花的時間
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job:
+                job["emitted"] = time.perf_counter()
+
+    def job_delivered(self, job_id, status="ok"):
+        """介面收到結果時呼叫：記錄 ui_delivery span 與整個工作的總延遲"""
+        now = time.perf_counter()
+        with self._lock:
+            job = self._jobs.pop(job_id, None)
+            if job is None:
+                return
+            total = now - job["start"]
+            self._totals.append(total)
+            self.last_total = total
+        if job["emitted"] is not None:
+            self._write({
+                "job_id": job_id,
+                "span": "ui_delivery",
+                "start": job["start_wall"] + (job["emitted"] - job["start"]),
+                "duration_ms": round((now - job["emitted"]) * 1000, 3),
+                "status": "ok",
+            })
+        self._write({
+            "job_id": job_id,
+            "span": "job",
+            "start": job["start_wall"],
+            "duration_ms": round(total * 1000, 3),
+            "status": status,
+        })
+
+    def job_cancelled(self, job_id):
+        """被較新請求取代的工作：只記錄 job 紀錄，不列入延遲統計"""
+        with self._lock:
+            job = self._jobs.pop(job_id, None)
+        if job is None:
+            return
+        self._write({
+            "job_id": job_id,
+            "span": "job",
+            "start": job["start_wall"],
+            "duration_ms": round((time.perf_counter() - job["start"]) * 1000, 3),
+            "status": "cancelled",
+        })
+
+    def summary(self):
+        """最近一次延遲與滾動 p95 (秒)"""
+        with self._lock:
+            ordered = sorted(self._totals)
+        p95 = ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))] if ordered else None
+        return {"last": self.last_total, "p95": p95, "count": len(ordered)}
+
+
+def optional_span(tracer, job_id, name, **attrs):
+    """tracer 為 None 時 (監看模式的高頻取樣、批次模式) 不寫 span，只回傳可照常填寫的 attrs"""
+    return tracer.span(job_id, name, **attrs) if tracer else nullcontext(attrs)
+
+
+_tracer = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer():
+    """取得全域共用的 Tracer (TRACE_ENABLED 關閉時只統計、不寫檔)"""
+    global _tracer
+    with _tracer_lock:
+        if _tracer is None:
+            _tracer = Tracer(
+                config.TRACE_LOG_PATH if config.TRACE_ENABLED else None,
+                max_bytes=config.TRACE_MAX_BYTES,
+                backup_count=config.TRACE_BACKUP_COUNT,
+            )
+        return _tracer
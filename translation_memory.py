@@ -0,0 +1,149 @@
+# translation_memory 負責模糊翻譯記憶：OCR 把同一句台詞認得稍有不同時 (l/I、多餘標點、斷開的空白)，仍能沿用舊譯文。
+import re
+import threading
+import unicodedata
+from collections import Counter, OrderedDict
+
+import config
+
+# 遊戲字型上常被互相誤認的字元，比對前統一成同一個
+_CONFUSABLES = str.maketrans({"I": "l", "|": "l", "1": "l", "!": "l", "0": "o", "O": "o"})
+# 沒有整體合併、但 OCR 也常互相認錯的小寫字母：只在比對時允許少數幾個位置這樣不同
+_GLYPH_PAIRS = {frozenset(pair) for pair in ("ce", "il", "ij", "uv", "tf")}
+_NOISE = re.compile(r"[\W_]+", re.UNICODE)
+_DIGITS = re.compile(r"\d+")
+
+
+def match_key(text):
+    """比對用的字串：全半形統一、轉小寫、合併易混淆字元、去掉空白與標點"""
+    text = unicodedata.normalize("NFKC", text)
+    text = text.replace("rn", "m").translate(_CONFUSABLES).lower()
+    return _NOISE.sub("", text)
+
+
+def glyph_edits(a, b):
+    """兩個 match_key 之間的易混淆字元替換數；有任何其他差異 (長度不同、非易混淆字元) 時回傳 None
+
+    只接受字形雜訊：can / can't、not / now、save / leave 這類改變語意的差異一律不算同一句。
+    """
+    if len(a) != len(b):
+        return None
+    edits = 0
+    for x, y in zip(a, b):
+        if x != y:
+            if frozenset((x, y)) not in _GLYPH_PAIRS:
+                return None
+            edits += 1
+    return edits
+
+
+def _grams(key, n=3):
+    if len(key) <= n:
+        return {key}
+    return {key[i:i + n] for i in range(len(key) - n + 1)}
+
+
+class FuzzyTranslationMemory:
+    """以字元 3-gram 倒排索引找候選，再確認兩者只差在易混淆字元 (glyph_edits)
+
+    match_key 已經抹掉空白、標點與常見誤認字元；剩下的差異最多 max_edits 個易混淆字元才沿用，
+    不用整體相似度，避免把意思不同但字面相近的句子 (can / can't) 當成同一句。
+    數字不同的句子 (HP 120 / HP 121) 一律不視為同一句；太短的字串只接受完全相同。
+    """
+
+    # 每次查詢最多仔細比對幾個候選
+    MAX_CANDIDATES = 8
+
+    def __init__(self, max_edits=2, max_entries=20000, min_chars=8):
+        self.max_edits = max_edits
+        self.max_entries = max_entries
+        self.min_chars = min_chars
+        self._entries = OrderedDict()  # match_key -> (數字序列, 譯文, 後端標籤)
+        self._index = {}               # gram -> {match_key, ...}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, text):
+        """回傳 (譯文, 後端標籤, 相似度)，找不到時回傳 None"""
+        key = match_key(text)
+        if not key:
+            return None
+        digits = _DIGITS.findall(text)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == digits:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1], entry[2], 1.0
+
+            if len(key) >= self.min_chars:
+                best = self._best_match(key, digits)
+                if best is not None:
+                    best_key, ratio = best
+                    self._entries.move_to_end(best_key)
+                    self.hits += 1
+                    _, translation, label = self._entries[best_key]
+                    return translation, label, ratio
+
+            self.misses += 1
+            return None
+
+    def _best_match(self, key, digits):
+        grams = _grams(key)
+        counts = Counter()
+        for gram in grams:
+            counts.update(self._index.get(gram, ()))
+
+        best, best_edits = None, self.max_edits + 1
+        for candidate, _ in counts.most_common(self.MAX_CANDIDATES):
+            if self._entries[candidate][0] != digits:
+                continue
+            edits = glyph_edits(candidate, key)
+            if edits is not None and edits < best_edits:
+                best, best_edits = candidate, edits
+        return (best, 1 - best_edits / len(key)) if best is not None else None
+
+    def add(self, text, translation, label):
+        key = match_key(text)
+        if not key or not translation:
+            return
+        with self._lock:
+            if key not in self._entries:
+                for gram in _grams(key):
+                    self._index.setdefault(gram, set()).add(key)
+            self._entries[key] = (_DIGITS.findall(text), translation, label)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key):
+        del self._entries[key]
+        for gram in _grams(key):
+            keys = self._index.get(gram)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._index[gram]
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": len(self._entries),
+        }
+
+
+def load_translation_memory(cache=None, labels=None):
+    """建立翻譯記憶，並以翻譯快取中最近使用的紀錄預先填入；labels 為 後端名稱 -> 顯示標籤"""
+    memory = FuzzyTranslationMemory(
+        max_edits=config.FUZZY_MEMORY_MAX_EDITS,
+        max_entries=config.FUZZY_MEMORY_MAX_ENTRIES,
+        min_chars=config.FUZZY_MEMORY_MIN_CHARS,
+    )
+    if cache is not None:
+        for source, backend, translation in cache.recent_entries(config.FUZZY_MEMORY_MAX_ENTRIES):
+            memory.add(source, translation, (labels or {}).get(backend, backend))
+    return memory
@@ -0,0 +1,228 @@
+# video_subtitles 從錄好的遊戲影片擷取對話框文字並翻譯，輸出成 SRT 字幕檔。
+# 只在文字區的畫面 (像素差比例) 改變時才 OCR；解碼、OCR 與翻譯三段同時進行。
+# 用法:
+#   python video_subtitles.py gameplay.mp4 --crop 200,820,1500,220     # 對話框位置 (影片像素 x,y,w,h)
+#   python video_subtitles.py gameplay.mp4 --select                    # 在第一個影格上用滑鼠框選
+#   python video_subtitles.py gameplay.mp4 --crop ... --no-translate   # 只輸出原文字幕
+import argparse
+import os
+import sys
+import threading
+import time
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+
+import config
+from cache import normalize_text
+from frame_hash import changed_ratio
+from ocr_engines import create_ocr_engine
+from pipeline import BatchTranslator, create_translation_chain, recognize_frame
+
+# 一段文字區畫面的時間區間；gray 是區間穩定後的最後一個取樣影格 (逐字出現的文字此時已完整)
+Segment = namedtuple("Segment", ["index", "start", "end", "gray"])
+
+
+def parse_crop(value):
+    x, y, w, h = (int(v) for v in value.split(","))
+    return x, y, w, h
+
+
+def select_crop(path):
+    """在影片第一個影格上用滑鼠框選文字區 (Enter 確認)"""
+    cap = cv2.VideoCapture(path)
+    ok, frame = cap.read()
+    cap.release()
+    if not ok:
+        sys.exit(f"無法讀取影片：{path}")
+    rect = cv2.selectROI("選取文字區 (Enter 確認)", frame, showCrosshair=False)
+    cv2.destroyAllWindows()
+    if rect[2] == 0 or rect[3] == 0:
+        sys.exit("未選取任何區域")
+    return tuple(int(v) for v in rect)
+
+
+def sample_segments(path, crop=None, sample_fps=4.0, threshold=0.0005, settle_samples=2):
+    """依 sample_fps 取樣影格、裁切文字區，文字區穩定後又改變時結束目前區間並產生 Segment
+
+    相鄰取樣影格的像素差比例超過 threshold 就算改變 (外觀相近、只差一個單字的兩句指紋可能相同，所以不用指紋)；
+    連續 settle_samples 個取樣都沒變才算穩定，逐字出現的文字在顯示完之前不會被切成多段。
+    穩定之前就又換掉的畫面併入下一段。不取樣的影格只 grab() 不 retrieve()，省下色彩轉換與複製的成本。
+    """
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise IOError(f"無法開啟影片：{path}")
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    step = max(1, int(round(fps / sample_fps)))
+
+    index = 0
+    frame_no = -1
+    start = last_time = None
+    last_gray = None
+    stable_gray = None  # 目前區間穩定下來的畫面 (還沒穩定時為 None)
+    run = 0             # 連續幾個取樣與前一個相同 (含目前這個)
+    try:
+        while cap.grab():
+            frame_no += 1
+            if frame_no % step:
+                continue
+            ok, frame = cap.retrieve()
+            if not ok:
+                break
+            if crop:
+                x, y, w, h = crop
+                frame = frame[y:y + h, x:x + w]
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            now = frame_no / fps
+
+            if last_gray is not None and changed_ratio(last_gray, gray, config.WATCH_PIXEL_DELTA) > threshold:
+                if stable_gray is not None:
+                    yield Segment(index, start, now, stable_gray)
+                    index += 1
+                    start, stable_gray = now, None
+                run = 1
+            else:
+                run += 1
+            if start is None:
+                start = now
+            if run >= settle_samples:
+                stable_gray = gray
+            last_gray, last_time = gray, now
+        if last_gray is not None:
+            yield Segment(index, start, last_time + step / fps,
+                          stable_gray if stable_gray is not None else last_gray)
+    finally:
+        cap.release()
+
+
+def format_timestamp(seconds):
+    ms = int(round(seconds * 1000))
+    h, ms = divmod(ms, 3600000)
+    m, ms = divmod(ms, 60000)
+    s, ms = divmod(ms, 1000)
+    return f"{h:02d}:{m:02d}:{s:02d},{ms:03d}"
+
+
+class SubtitleWriter:
+    """依區間順序寫出 SRT：結果可能亂序到達，先暫存再照 index 輸出；相鄰且文字相同的區間合併成一條"""
+
+    def __init__(self, out, gap):
+        self.out = out
+        self.gap = gap         # 兩個區間相隔不超過這麼久才合併
+        self._ready = {}       # index -> record (沒有文字的區間為 None)
+        self._next = 0
+        self._last = None      # 還可能被延長、尚未寫出的上一條
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def put(self, index, record):
+        with self._lock:
+            self._ready[index] = record
+            while self._next in self._ready:
+                self._append(self._ready.pop(self._next))
+                self._next += 1
+
+    def _append(self, record):
+        if record is None or not record.get("subtitle"):
+            return
+        last = self._last
+        if (last is not None and normalize_text(last["subtitle"]) == normalize_text(record["subtitle"])
+                and record["start"] - last["end"] <= self.gap):
+            last["end"] = record["end"]
+            return
+        self._flush_last()
+        self._last = record
+
+    def _flush_last(self):
+        if self._last is None:
+            return
+        self.count += 1
+        self.out.write(f"{self.count}\n{format_timestamp(self._last['start'])} --> "
+                       f"{format_timestamp(self._last['end'])}\n{self._last['subtitle']}\n\n")
+        self.out.flush()
+        self._last = None
+
+    def close(self):
+        with self._lock:
+            self._flush_last()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="從遊戲影片擷取文字並翻譯成 SRT 字幕")
+    parser.add_argument("video", help="影片檔路徑")
+    parser.add_argument("--crop", type=parse_crop, help="文字區 x,y,w,h (影片像素)，不指定則使用整個畫面")
+    parser.add_argument("--select", action="store_true", help="在第一個影格上用滑鼠框選文字區")
+    parser.add_argument("--output", help="SRT 輸出檔 (預設與影片同名)")
+    parser.add_argument("--sample-fps", type=float, default=config.WATCH_SAMPLE_HZ, help="每秒取樣幾個影格")
+    parser.add_argument("--threshold", type=float, default=config.WATCH_CHANGE_RATIO,
+                        help="相鄰取樣影格改變的像素比例超過此值就切成新的區間")
+    parser.add_argument("--settle-samples", type=int, default=config.VIDEO_SETTLE_SAMPLES,
+                        help="文字區連續幾個取樣不變才算一段字幕 (逐字出現的文字不會被切成多段)")
+    parser.add_argument("--workers", type=int, default=config.OCR_WORKERS, help="OCR 執行緒數")
+    parser.add_argument("--ocr-engine", default=None, help="覆寫 config.OCR_ENGINE")
+    parser.add_argument("--no-translate", action="store_true", help="只輸出原文字幕")
+    args = parser.parse_args()
+
+    crop = select_crop(args.video) if args.select else args.crop
+    output = args.output or os.path.splitext(args.video)[0] + ".srt"
+
+    # OCR 執行緒各自常駐一個引擎
+    local = threading.local()
+    engines = []
+    engines_lock = threading.Lock()
+
+    def ocr(segment):
+        engine = getattr(local, "engine", None)
+        if engine is None:
+            engine = local.engine = create_ocr_engine(args.ocr_engine)
+            with engines_lock:
+                engines.append(engine)
+        try:
+            text, error = recognize_frame(engine, segment.gray), None
+        except Exception as e:
+            text, error = "", str(e)
+        return {"index": segment.index, "start": segment.start, "end": segment.end, "text": text, "error": error}
+
+    started = time.perf_counter()
+    segments = 0
+    with open(output, "w", encoding="utf-8") as out:
+        subtitles = SubtitleWriter(out, gap=1.5 / args.sample_fps)
+
+        def write(record):
+            record["subtitle"] = record["text"] if args.no_translate else (record.get("translation") or "")
+            subtitles.put(record["index"], record)
+
+        translator = None if args.no_translate else BatchTranslator(
+            create_translation_chain(), write, config.BATCH_MAX_SEGMENTS, config.BATCH_MAX_CHARS)
+
+        def forward(record):
+            # 沒有文字的區間也要交給 SubtitleWriter，後面的區間才能照順序寫出
+            if translator is None or not record["text"]:
+                write(record)
+            else:
+                translator.add(record)
+
+        # OCR 結果依區間順序交給翻譯；同時進行中的 OCR 數量有上限，避免解碼跑太前面佔滿記憶體
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=args.workers, thread_name_prefix="video-ocr") as pool:
+            for segment in sample_segments(args.video, crop, args.sample_fps, args.threshold, args.settle_samples):
+                segments += 1
+                pending.append(pool.submit(ocr, segment))
+                while pending and (pending[0].done() or len(pending) > args.workers * 4):
+                    forward(pending.popleft().result())
+            while pending:
+                forward(pending.popleft().result())
+
+        if translator is not None:
+            translator.finish()
+        subtitles.close()
+
+    for engine in engines:
+        engine.close()
+    elapsed = time.perf_counter() - started
+    print(f"[INFO] {segments} 個畫面區間 -> {subtitles.count} 條字幕，耗時 {elapsed:.1f}s，輸出到 {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,130 +2,557 @@ import cv2
 import numpy as np
 import mss
 import mss.tools
+import time
+import queue
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait
 from PySide6.QtCore import QThread, Signal
-from PySide6.QtGui import QGuiApplication, QScreen
-from PySide6.QtCore import QPoint
-from deep_translator import GoogleTranslator
-import pytesseract
 import config  # 引入設定檔
-from google import genai  # 引入 Gemini SDK
+from backends import JobCancelled, TranslationError, build_backend_chain, create_gemini_client
+from batching import TranslationBatcher
+from ocr_engines import create_ocr_engine
+from pipeline import recognize_frame
+from frame_buffers import FrameRing, bgra_view
+from frame_hash import FrameOCRCache, changed_ratio, frame_fingerprint
+from language import SAME_LANGUAGE_LABEL, RegionLanguages, is_target_language
+from incremental import LineTracker, split_lines, translate_incremental
+from translation_memory import load_translation_memory
+from tracing import get_tracer, optional_span
+from startup import get_startup_report
 
-# 設定 Tesseract 路徑 (請確認路徑正確)
-pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
+print(f"OCR 引擎已就緒。翻譯策略: {config.TRANSLATION_POLICY} (後端順序: {' -> '.join(config.BACKEND_ORDER)})。")
+
+
+def _to_gray(sct_img, frames, key):
+    # 直接讀 mss 的原始緩衝區；有 FrameRing 時寫進重複使用的槽位
+    if frames is not None:
+        return frames.grayscale(key, sct_img)
+    return cv2.cvtColor(bgra_view(sct_img), cv2.COLOR_BGRA2GRAY)
+
+
+def capture_regions(sct, regions, tracer=None, job_id=None, frames=None):
+    """一次截圖取得多個區域 {名稱: 灰階圖}，regions 為 [(名稱, 實體像素區域), ...] (由 GeometryService 事先換算)
+
+    抓所有區域的聯集只呼叫一次 sct.grab 後切出各塊；
+    區域分散太遠 (聯集比各區域總和大太多，例如跨螢幕) 時改成逐一截圖。
+    frames (FrameRing) 有給時灰階圖寫進它的槽位，回傳的影格在之後 frames.slots 次截圖內有效。
+    """
+    monitors = list(regions)
+
+    left = min(m["left"] for _, m in monitors)
+    top = min(m["top"] for _, m in monitors)
+    right = max(m["left"] + m["width"] for _, m in monitors)
+    bottom = max(m["top"] + m["height"] for _, m in monitors)
+    union_area = (right - left) * (bottom - top)
+    total_area = sum(m["width"] * m["height"] for _, m in monitors)
+
+    results = {}
+    if len(monitors) == 1 or union_area <= total_area * config.UNION_GRAB_MAX_RATIO:
+        union = {"top": top, "left": left, "width": right - left, "height": bottom - top}
+        with optional_span(tracer, job_id, "grab", width=union["width"], height=union["height"]):
+            sct_img = sct.grab(union)
+        with optional_span(tracer, job_id, "color"):
+            gray = _to_gray(sct_img, frames, ("grab", None))
+        for name, m in monitors:
+            x, y = m["left"] - left, m["top"] - top
+            results[name] = gray[y:y + m["height"], x:x + m["width"]]
+    else:
+        for name, m in monitors:
+            with optional_span(tracer, job_id, "grab", region=name, width=m["width"], height=m["height"]):
+                sct_img = sct.grab(m)
+            with optional_span(tracer, job_id, "color", region=name):
+                results[name] = _to_gray(sct_img, frames, ("grab", name))
+    return results
+
+
+def format_regions(results):
+    """把各區域的 (名稱, 文字) 組成顯示用字串；只有一個區域時不加標題"""
+    if len(results) == 1:
+        return results[0][1]
+    return "\n\n".join(f"【{name}】\n{text}" for name, text in results)
+
+
+# 一次截圖翻譯工作
+# regions: ((名稱, {"top", "left", "width", "height"}), ...)
+# geometry: 介面執行緒換算座標的量測 {"start", "duration", "cached"}，由 worker 記成這個工作的 geometry span
+CaptureJob = namedtuple("CaptureJob", ["job_id", "regions", "geometry"], defaults=(None,))
 
-print("OCR 引擎已就緒。優先使用 Gemini 翻譯，失敗時回退 Google Translator。")
 
 class OCRTranslateWorker(QThread):
-    result_ready = Signal(str, str)
-    error_occurred = Signal(str)
+    """常駐的背景工作執行緒：從佇列取出工作，重複使用截圖、OCR 與翻譯資源"""
+    result_ready = Signal(int, str, str)  # (job_id, 原文, 譯文)
+    error_occurred = Signal(int, str)  # (job_id, 錯誤訊息)
+    job_finished = Signal(int)  # 每個工作結束 (不論成功或失敗) 都會送出其 job_id
+    partial_result = Signal(int, str, str)  # 串流模式下的 (job_id, 原文, 目前為止的譯文)
+    ready = Signal()  # 背景暖機完成 (OCR 引擎、翻譯後端與連線都已就緒)
 
-    def __init__(self, region, scale_factor=1.0):
+    def __init__(self):
         super().__init__()
-        self.region = region  # (x, y, w, h)
-        self.scale_factor = scale_factor
-        
-        # 初始化 Gemini Client (如果 Key 存在)
+        self._jobs = queue.Queue()
+        self._next_job_id = 0
+        # 最新送出的工作；比它舊的工作在下一個階段邊界就會被取消 (latest-wins)
+        self._latest_job_id = 0
+        self._stopping = False
+        self.ocr_engine = None
+        # 多區域時在執行緒池平行 OCR，每條執行緒各自擁有一個常駐 OCR 引擎
+        self._pool = ThreadPoolExecutor(max_workers=config.OCR_WORKERS, thread_name_prefix="ocr")
+        self._local = threading.local()
+        self._pool_engines = []
+        self._pool_engines_lock = threading.Lock()
+        # 本機服務的 OCR 請求排進自己的小執行緒池，用啟動時就暖好的固定幾個引擎 (不在請求時建立冷引擎)
+        self._server_pool = None
+        if config.LOCAL_SERVER_ENABLED:
+            self._server_pool = ThreadPoolExecutor(
+                max_workers=config.LOCAL_SERVER_OCR_WORKERS, thread_name_prefix="server-ocr")
+        # 截圖的灰階影格與等待穩定時的畫面歷史都寫進預先配置的緩衝區 (只在 worker 執行緒使用)
+        self._frames = FrameRing(slots=config.CAPTURE_RING_SLOTS)
+        self._settle_history = FrameRing(slots=config.STABILITY_HISTORY_SIZE)
+        self.frame_cache = FrameOCRCache(
+            max_size=config.FRAME_CACHE_SIZE, threshold=config.FRAME_HASH_THRESHOLD,
+            pixel_delta=config.FRAME_VERIFY_PIXEL_DELTA, change_ratio=config.FRAME_VERIFY_CHANGE_RATIO,
+            thumb_size=config.FRAME_VERIFY_SIZE,
+        )
+        self._line_trackers = {}  # 區域名稱 -> LineTracker (逐行增量翻譯)
+        # 每個區域記住上次辨識出的文字系統，之後只載入對應的 Tesseract 語言
+        self.languages = None
+        if config.OCR_LANG_AUTO:
+            self.languages = RegionLanguages(
+                config.OCR_LANG, config.OCR_SCRIPT_LANGS,
+                min_confidence=config.OCR_LANG_MIN_CONFIDENCE, reprobe_every=config.OCR_LANG_REPROBE_EVERY,
+            )
+
+        # 以下資源都在 run() 開頭的 _warm_up() 中 (worker 執行緒) 建立，不拖慢視窗出現
         self.gemini_client = None
+        self.translator = None
+        self.memory = None  # 模糊翻譯記憶
+        self.batcher = None  # 多區域同時完成 OCR 時，把各區域的文字合併成一次翻譯請求
+        self.warmed = threading.Event()  # 暖機完成後設定 (本機服務等它才開始處理請求)
+
+    def submit(self, regions, geometry=None):
+        """排入一個截圖翻譯工作，regions 為 [(名稱, 實體像素區域), ...]，回傳 job_id
+
+        geometry 是介面換算 regions 的量測 ({"start", "duration", "cached"})，有給時記錄成 geometry span。
+        新工作會取代所有尚未完成的舊工作，舊工作在下一個階段邊界停止。
+        """
+        self._next_job_id += 1
+        self._latest_job_id = self._next_job_id
+        self._jobs.put(CaptureJob(self._next_job_id, tuple(regions), geometry))
+        return self._next_job_id
+
+    def stop(self):
+        """請求結束：進行中的工作在下一個階段邊界停止，之後 run() 釋放資源並返回"""
+        self._stopping = True
+        self._jobs.put(None)
+
+    def is_stale(self, job_id):
+        return self._stopping or job_id != self._latest_job_id
+
+    def _check_cancelled(self, job_id):
+        if self.is_stale(job_id):
+            raise JobCancelled()
+
+    def _warm_up(self):
+        """建立翻譯後端與 OCR 引擎，並各自先跑一次，讓第一次按 F9 不必付冷啟動成本"""
+        report = get_startup_report()
+
+        # 初始化 Gemini Client (如果 Key 存在)，整個程式生命週期只建立一次
         if config.GOOGLE_API_KEY:
+            with report.phase("Gemini Client"):
+                try:
+                    self.gemini_client = create_gemini_client(config.GOOGLE_API_KEY)
+                except Exception as e:
+                    print(f"[WARN] Gemini Client 初始化失敗: {e}")
+        with report.phase("翻譯後端"):
+            self.translator = build_backend_chain(self.gemini_client)
+            if config.BATCH_TRANSLATION:
+                self.batcher = TranslationBatcher(
+                    self.translator,
+                    window=config.BATCH_WINDOW_MS / 1000,
+                    max_segments=config.BATCH_MAX_SEGMENTS,
+                    max_chars=config.BATCH_MAX_CHARS,
+                )
+
+        # OCR 引擎在此執行緒建立一次，之後每個工作共用；先辨識一張空白圖讓 traineddata 真正載入
+        with report.phase("OCR 引擎"):
+            self.ocr_engine = create_ocr_engine()
+            self._local.engine = self.ocr_engine
+        with report.phase("OCR 暖機"):
             try:
-                self.gemini_client = genai.Client(api_key=config.GOOGLE_API_KEY)
+                blank = np.full((32, 96), 255, dtype=np.uint8)
+                self.ocr_engine.recognize(blank, single_line=True)
+                # 縮小後可能用到的單一語言也先載入 (tesserocr 每種組合各自常駐一個 handle)
+                if self.languages is not None and self.ocr_engine.selectable_lang:
+                    for lang in self.languages.candidate_langs():
+                        self.ocr_engine.recognize(blank, single_line=True, lang=lang)
             except Exception as e:
-                print(f"[WARN] Gemini Client 初始化失敗: {e}")
+                print(f"[WARN] OCR 暖機失敗: {e}")
+        # 多區域時執行緒池也需要各自的引擎
+        pool_engines = min(len(config.REGION_NAMES), config.OCR_WORKERS)
+        if pool_engines > 1:
+            with report.phase(f"OCR 執行緒池引擎 x{pool_engines}"):
+                self._warm_pool_engines(self._pool, pool_engines)
+        if self._server_pool is not None:
+            with report.phase(f"本機服務 OCR 引擎 x{config.LOCAL_SERVER_OCR_WORKERS}"):
+                self._warm_pool_engines(self._server_pool, config.LOCAL_SERVER_OCR_WORKERS)
+
+        # 先打一個不計費的模型查詢，建立好 Gemini 的 TLS 連線 (之後的請求重複使用)
+        if self.gemini_client:
+            with report.phase("Gemini 連線"):
+                try:
+                    self.gemini_client.models.get(model=config.MODEL_NAME)
+                except Exception as e:
+                    print(f"[WARN] Gemini 連線暖機失敗: {e}")
+
+        if config.FUZZY_MEMORY_ENABLED:
+            with report.phase("翻譯記憶索引"):
+                self.memory = load_translation_memory(
+                    self.translator.cache, {b.name: b.label for b in self.translator.backends})
+            print(f"[INFO] 翻譯記憶已載入 {self.memory.stats()['entries']} 筆")
+
+    def _warm_pool_engines(self, pool, count):
+        # 用 barrier 讓每個暖機任務卡住自己的執行緒，確保 count 條執行緒都各自建立引擎
+        barrier = threading.Barrier(count)
+
+        def init():
+            self._thread_ocr_engine()
+            try:
+                barrier.wait(timeout=5)
+            except threading.BrokenBarrierError:
+                pass
+
+        for future in [pool.submit(init) for _ in range(count)]:
+            future.result()
 
     def run(self):
+        self._warm_up()
+        self.warmed.set()
+        # mss 物件綁定建立它的執行緒，所以在這裡建立並在整個迴圈重複使用
+        with get_startup_report().phase("mss 截圖"):
+            try:
+                sct = mss.mss()
+            except Exception as e:
+                print(f"[WARN] 無法初始化截圖: {e}")
+                sct = None
+        self.ready.emit()
+
         try:
-            x, y, w, h = self.region
-            
-            # --- 1. 螢幕截圖邏輯 (保留原本的 DPI 修正) ---
-            center_x = x + w / 2
-            center_y = y + h / 2
-            target_screen = QGuiApplication.screenAt(QPoint(int(center_x), int(center_y)))
-            if not target_screen:
-                target_screen = QGuiApplication.primaryScreen()
-
-            qt_geo = target_screen.geometry()
-            qt_origin_x = qt_geo.x()
-            qt_origin_y = qt_geo.y()
-            current_scale = target_screen.devicePixelRatio()
-
-            screens = QGuiApplication.screens()
-            screen_index = screens.index(target_screen) if target_screen in screens else 0
-            mss_monitor_idx = screen_index + 1
+            while True:
+                job = self._jobs.get()
+                if job is None:
+                    break
+                # 排隊期間已經有更新的請求，直接略過
+                if not self.is_stale(job.job_id):
+                    self._process(sct, job)
+                self.job_finished.emit(job.job_id)
+        finally:
+            if sct:
+                sct.close()
+            self._pool.shutdown(wait=True)
+            if self._server_pool is not None:
+                self._server_pool.shutdown(wait=True)
+            self.ocr_engine.close()
+            for engine in self._pool_engines:
+                engine.close()
 
-            with mss.mss() as sct:
-                if mss_monitor_idx < len(sct.monitors):
-                    mss_mon = sct.monitors[mss_monitor_idx]
-                    mss_origin_x = mss_mon['left']
-                    mss_origin_y = mss_mon['top']
-                    
-                    rel_x = x - qt_origin_x
-                    rel_y = y - qt_origin_y
-                    
-                    final_x = int(mss_origin_x + (rel_x * current_scale))
-                    final_y = int(mss_origin_y + (rel_y * current_scale))
-                    final_w = int(w * current_scale)
-                    final_h = int(h * current_scale)
-                else:
-                    final_x = int(x * current_scale)
-                    final_y = int(y * current_scale)
-                    final_w = int(w * current_scale)
-                    final_h = int(h * current_scale)
-
-                monitor = {"top": final_y, "left": final_x, "width": final_w, "height": final_h}
-                sct_img = sct.grab(monitor)
-                img_np = np.array(sct_img)
-                gray = cv2.cvtColor(img_np, cv2.COLOR_BGRA2GRAY)
-
-            # --- 2. 圖像預處理 & OCR ---
-            scaled = cv2.resize(gray, None, fx=2.0, fy=2.0, interpolation=cv2.INTER_CUBIC)
-            _, binary = cv2.threshold(scaled, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-            
-            detected_text = pytesseract.image_to_string(binary, lang='eng+chi_tra', config='--psm 6')
-            detected_text = detected_text.strip()
-            
-            print(f"[DEBUG] OCR Result: {detected_text}")
-
-            if not detected_text:
-                self.error_occurred.emit("OCR 未偵測到文字")
+    def _thread_ocr_engine(self):
+        # 執行緒池中的執行緒第一次用到時才建立自己的引擎
+        engine = getattr(self._local, "engine", None)
+        if engine is None:
+            engine = create_ocr_engine()
+            self._local.engine = engine
+            with self._pool_engines_lock:
+                self._pool_engines.append(engine)
+        return engine
+
+    def _process(self, sct, job):
+        tracer = get_tracer()
+        tracer.begin_job(job.job_id)
+        if job.geometry:
+            tracer.record(job.job_id, "geometry", job.geometry["start"], job.geometry["duration"],
+                          regions=len(job.regions), cached=job.geometry["cached"])
+        try:
+            if sct is None:
+                self._emit_error(job.job_id, "處理錯誤：截圖功能無法使用")
+                return
+
+            # --- 1. 螢幕截圖 (所有區域共用一次 grab)，逐字出現的對話等它顯示完 ---
+            frames = capture_regions(sct, job.regions, tracer, job.job_id, self._frames)
+            # 每個區域都是已經辨識過的畫面 (文字早已顯示完) 就不必等待
+            if config.STABILITY_GATE and not self._all_cached(frames):
+                frames = self._wait_until_stable(sct, job, frames)
+            self._check_cancelled(job.job_id)
+
+            # 串流模式下各區域的部分譯文，合併後一起推給介面
+            partials = {}
+            partial_lock = threading.Lock()
+
+            def on_partial(name, src, partial):
+                if self.is_stale(job.job_id):
+                    return
+                with partial_lock:
+                    partials[name] = (src, partial)
+                    ordered = [(n, partials[n]) for n, _ in job.regions if n in partials]
+                self.partial_result.emit(
+                    job.job_id,
+                    format_regions([(n, p[0]) for n, p in ordered]),
+                    format_regions([(n, p[1]) for n, p in ordered]),
+                )
+
+            # --- 2~4. 各區域 OCR + 翻譯；多區域時平行處理，總延遲接近最慢的那一塊 ---
+            if len(frames) == 1:
+                name, gray = next(iter(frames.items()))
+                results = [self._process_region(job.job_id, name, gray, on_partial)]
+            else:
+                futures = [self._pool.submit(self._process_region, job.job_id, name, gray, on_partial, True)
+                           for name, gray in frames.items()]
+                # 等所有區域都停下來才離開 (包含被取消的)，下一次截圖才不會覆寫還在使用中的影格
+                wait(futures)
+                results = [f.result() for f in futures]
+
+            # 翻譯期間有更新的請求送進來，這份結果已經過時，不送給介面
+            self._check_cancelled(job.job_id)
+            results = [r for r in results if r[1]]
+            if not results:
+                self._emit_error(job.job_id, "OCR 未偵測到文字")
                 return
 
-            # --- 3. 翻譯邏輯 (Gemini -> Fallback) ---
-            translated_text = self._translate_text(detected_text)
-            self.result_ready.emit(detected_text, translated_text)
+            tracer.job_emitted(job.job_id)
+            self.result_ready.emit(
+                job.job_id,
+                format_regions([(name, src) for name, src, _ in results]),
+                format_regions([(name, trans) for name, _, trans in results]),
+            )
 
+        except JobCancelled:
+            print(f"[DEBUG] 工作 {job.job_id} 已被較新的請求取代，停止處理")
+            tracer.job_cancelled(job.job_id)
         except Exception as e:
             import traceback
             traceback.print_exc()
-            self.error_occurred.emit(f"處理錯誤：{str(e)}")
+            self._emit_error(job.job_id, f"處理錯誤：{str(e)}")
 
-    def _translate_text(self, text):
-        """雙層翻譯策略：Gemini -> Google Translator"""
-        
-        # 嘗試 1: Gemini API
-        if self.gemini_client:
-            try:
-                print("[INFO] 嘗試使用 Gemini 翻譯...")
-                prompt = (
-                    f"Translate the following text into {config.TARGET_LANG}. "
-                    f"Output ONLY the translated text without explanations.\n\n"
-                    f"{text}"
-                )
-                response = self.gemini_client.models.generate_content(
-                    model=config.MODEL_NAME,
-                    contents=prompt
-                )
-                if response.text:
-                    return f"[Gemini] {response.text.strip()}"
-            except Exception as e:
-                print(f"[WARN] Gemini 翻譯失敗 ({e})，切換至備用方案。")
+    def _all_cached(self, frames):
+        return all(self.frame_cache.contains(frame_fingerprint(gray, config.FRAME_HASH_SIZE), gray)
+                   for gray in frames.values())
+
+    def _wait_until_stable(self, sct, job, frames):
+        """連續小截圖直到所有區域 STABILITY_SETTLE_MS 內都沒有新變化 (或等滿 STABILITY_MAX_WAIT_MS)
+
+        跟這段期間任一張畫面相同就不算新變化，閃爍的「▼」之類的提示圖示不會讓等待無限延長；
+        第一張取樣就跟原本的畫面相同時 (文字沒有在逐字出現) 直接結束，靜止的畫面只多等一個取樣間隔。
+        """
+        with get_tracer().span(job.job_id, "settle") as span:
+            started = time.monotonic()
+            deadline = started + config.STABILITY_MAX_WAIT_MS / 1000
+            settle = config.STABILITY_SETTLE_MS / 1000
+            stable_since = started
+            # 每個區域期間出現過的不同畫面 (最多 STABILITY_HISTORY_SIZE 張)，複製進環狀緩衝區保留
+            history = self._settle_history
+            history.reset()
+            for name, gray in frames.items():
+                history.keep(name, gray)
+            changes = 0
+            while True:
+                now = time.monotonic()
+                if now - stable_since >= settle or now >= deadline:
+                    break
+                time.sleep(config.STABILITY_INTERVAL_MS / 1000)
+                self._check_cancelled(job.job_id)
+                frames = capture_regions(sct, job.regions, frames=self._frames)
+                for name, gray in frames.items():
+                    if all(changed_ratio(old, gray, config.STABILITY_PIXEL_DELTA) > config.STABILITY_CHANGE_RATIO
+                           for old in history.recent(name)):
+                        stable_since = time.monotonic()
+                        changes += 1
+                        history.keep(name, gray)
+                if not changes:
+                    break
+            span["changes"] = changes
+            span["settled"] = time.monotonic() < deadline
+        if changes:
+            print(f"[DEBUG] 文字區仍在變化，等待 {time.monotonic() - started:.2f}s 後才開始 OCR")
+        return frames
+
+    def _process_region(self, job_id, name, gray, on_partial, batched=False):
+        """單一區域的 指紋 -> 文字偵測 -> 前處理 -> OCR -> 翻譯，回傳 (名稱, 原文, 譯文)"""
+        engine = self._thread_ocr_engine()
+
+        # --- 2~3. 畫面指紋 (畫面沒變就沿用 OCR 結果) -> 文字行偵測 -> 圖像預處理 -> OCR ---
+        # 每個階段之間檢查是否已被較新的工作取代
+        detected_text = recognize_frame(
+            engine, gray, self.frame_cache, get_tracer(), job_id, region=name,
+            check=lambda: self._check_cancelled(job_id), languages=self.languages,
+        )
+
+        print(f"[DEBUG] [{name}] OCR Result: {detected_text}")
+        if not detected_text:
+            return name, "", ""
+        self._check_cancelled(job_id)
+
+        # 已經是目標語言 (例如繁體中文介面) 就不必翻譯，也不必等網路
+        if is_target_language(detected_text):
+            print(f"[INFO] [{name}] 文字已是目標語言，略過翻譯")
+            return name, detected_text, f"[{SAME_LANGUAGE_LABEL}] {detected_text}"
+
+        # --- 4. 翻譯邏輯 (Gemini -> Fallback) ---
+        # 只有標成紀錄 / 聊天的區域，或這次的行確實是上一次捲動後的結果，才逐行增量翻譯；
+        # 一般對話框整段送出，換行的句子保持完整，也能串流與查翻譯記憶
+        lines = split_lines(detected_text)
+        tracker = self._line_tracker(name) if config.LINE_INCREMENTAL else None
+        if tracker is not None and len(lines) > 1 and (
+                name in config.LINE_INCREMENTAL_REGIONS or tracker.scrolled(lines)):
+            return name, detected_text, self._translate_lines(name, tracker, detected_text, job_id)
+        translated_text = self._translate_text(
+            detected_text, job_id,
+            on_partial=lambda src, partial: on_partial(name, src, partial),
+            batched=batched,
+        )
+        if tracker is not None:
+            tracker.update(lines, None)
+        return name, detected_text, translated_text
+
+    # --- 本機服務 (local_server) 的請求：不經過工作佇列，也不受 latest-wins 取消影響 ---
+    def recognize_request(self, gray):
+        """在本機服務的執行緒池用暖機好的引擎辨識一張灰階圖 (畫面快取與 F9 共用)，回傳文字
+
+        同時送來的請求超過 LOCAL_SERVER_OCR_WORKERS 個時排隊等待，不會另外建立引擎。
+        """
+        return self._server_pool.submit(
+            lambda: recognize_frame(self._thread_ocr_engine(), gray, self.frame_cache, region="本機服務")).result()
+
+    def translate_request(self, text):
+        """翻譯一段文字，回傳 (後端標籤, 譯文)；同時送來的請求由批次器合併成一次後端呼叫"""
+        if is_target_language(text):
+            return SAME_LANGUAGE_LABEL, text
+        if self.memory is not None:
+            hit = self.memory.lookup(text)
+            if hit is not None:
+                return hit[1], hit[0]
+        if self.batcher:
+            backend, result = self.batcher.translate(text)
         else:
-            print("[INFO] 未設定 Gemini API Key，直接使用備用方案。")
+            backend, result = self.translator.translate(text)
+        if self.memory is not None:
+            self.memory.add(text, result, backend.label)
+        return backend.label, result
+
+    def _emit_error(self, job_id, message):
+        get_tracer().job_emitted(job_id)
+        self.error_occurred.emit(job_id, message)
+
+    def _translate_text(self, text, job_id=None, on_partial=None, batched=False):
+        """翻譯策略：依 TRANSLATION_POLICY 呼叫 Gemini / Google Translator (每個後端前面都先查快取)
+
+        batched=True 時交給批次器與其他區域合併成一次請求 (批次模式不串流)。
+        """
+        def emit_partial(backend, partial):
+            if on_partial:
+                on_partial(text, f"[{backend.label}] {partial}")
+
+        # 先查模糊翻譯記憶：OCR 雜訊造成的些微差異也能直接沿用舊譯文，不必呼叫任何後端
+        if self.memory is not None:
+            with get_tracer().span(job_id, "memory") as span:
+                hit = self.memory.lookup(text)
+                span["hit"] = hit is not None
+            if hit is not None:
+                translation, label, similarity = hit
+                print(f"[INFO] 翻譯記憶命中 (相似度 {similarity:.0%})")
+                return f"[{label}] {translation}"
 
-        # 嘗試 2: Google Translator (Fallback)
         try:
-            print("[INFO] 使用 Google Translator (Deep Translator)...")
-            dt = GoogleTranslator(source='auto', target='zh-TW')
-            result = dt.translate(text)
-            return f"[Google] {result}"
-        except Exception as e:
+            cancelled = lambda: self.is_stale(job_id)
+            if batched and self.batcher:
+                backend, result = self.batcher.translate(text, job_id=job_id, cancelled=cancelled)
+            else:
+                backend, result = self.translator.translate(
+                    text, on_partial=emit_partial, job_id=job_id, cancelled=cancelled)
+        except TranslationError as e:
             return f"翻譯完全失敗: {str(e)}"
+        if self.memory is not None:
+            self.memory.add(text, result, backend.label)
+
+        stats = self.translator.stats[backend.name].summary()
+        if stats["p50"] is not None:
+            print(f"[INFO] {backend.label} 延遲 p50={stats['p50']:.2f}s p95={stats['p95']:.2f}s")
+        return f"[{backend.label}] {result}"
+
+    def _line_tracker(self, name):
+        tracker = self._line_trackers.get(name)
+        if tracker is None:
+            tracker = LineTracker(max_edits=config.LINE_MATCH_MAX_EDITS, memory_size=config.LINE_MEMORY_SIZE,
+                                  min_overlap=config.LINE_SCROLL_MIN_OVERLAP)
+            self._line_trackers[name] = tracker
+        return tracker
+
+    def _translate_lines(self, name, tracker, text, job_id=None):
+        """逐行增量翻譯：只把這次新出現或改變的行一次送出，其餘行沿用上次的逐行譯文"""
+        with get_tracer().span(job_id, "translate_lines", region=name) as span:
+            try:
+                label, result, sent = translate_incremental(
+                    tracker, text, lambda lines: self.translator.translate_batch(
+                        lines, job_id=job_id, cancelled=lambda: self.is_stale(job_id)))
+            except TranslationError as e:
+                return f"翻譯完全失敗: {str(e)}"
+            span["new_lines"] = sent
+        print(f"[INFO] [{name}] 逐行增量翻譯：{sent}/{len(split_lines(text))} 行送出翻譯")
+        return f"[{label}] {result}"
+
+
+class RegionWatcher(QThread):
+    """監看模式：定期取樣所有選取區，任一區域畫面有明顯變化時才通知介面觸發翻譯"""
+    change_detected = Signal()
+
+    def __init__(self, regions):
+        super().__init__()
+        self._regions = tuple(regions)  # ((名稱, 實體像素區域), ...)
+        self._lock = threading.Lock()
+        self._running = True
+        self._last_emitted = {}  # 區域名稱 -> 上次觸發翻譯時的灰階畫面 (複本)
+        self._frames = FrameRing(slots=config.CAPTURE_RING_SLOTS)  # 持續取樣時重複使用的灰階緩衝區
+
+    def set_regions(self, regions):
+        # 選取框移動、縮放、新增或移除時由介面呼叫，下一次取樣就會用新區域
+        with self._lock:
+            self._regions = tuple(regions)
+            self._last_emitted = {}
+
+    def stop(self):
+        self._running = False
+
+    def run(self):
+        try:
+            with mss.mss() as sct:
+                self._watch_loop(sct)
+        except Exception as e:
+            print(f"[WARN] 監看模式無法啟動截圖: {e}")
+
+    def _watch_loop(self, sct):
+        interval = 1.0 / config.WATCH_SAMPLE_HZ
+        while self._running:
+            started = time.perf_counter()
+            try:
+                with self._lock:
+                    regions = self._regions
+                frames = capture_regions(sct, regions, frames=self._frames)
+
+                # 用像素差比例判斷：只換掉一個單字的新對話，畫面指紋可能完全相同
+                with self._lock:
+                    changed = any(
+                        name not in self._last_emitted or
+                        changed_ratio(self._last_emitted[name], gray, config.WATCH_PIXEL_DELTA)
+                        > config.WATCH_CHANGE_RATIO
+                        for name, gray in frames.items()
+                    )
+                    if changed:
+                        # 環狀緩衝區的槽位會被之後的取樣覆寫，留下複本
+                        self._last_emitted = {name: gray.copy() for name, gray in frames.items()}
+                if changed:
+                    self.change_detected.emit()
+            except Exception as e:
+                print(f"[WARN] 監看取樣失敗: {e}")
+
+            # CPU 預算：取樣花費的時間只能佔整個週期的 WATCH_CPU_BUDGET 比例
+            cost = time.perf_counter() - started
+            period = max(interval, cost / config.WATCH_CPU_BUDGET)
+            self.msleep(int(max(0.0, period - cost) * 1000))